@@ -12,7 +12,7 @@ from adaptive import utils
 from adaptive.learner import (
 	BaseLearner, Learner1D, Learner2D, LearnerND,
     AverageLearner, BalancingLearner, make_datasaver,
-    DataSaver, IntegratorLearner
+    DataSaver, IntegratorLearner, StackedLearner1D
 )
 
 with suppress(ImportError):
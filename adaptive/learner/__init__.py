@@ -8,6 +8,7 @@ from adaptive.learner.balancing_learner import BalancingLearner
 from adaptive.learner.learner1D import Learner1D
 from adaptive.learner.learner2D import Learner2D
 from adaptive.learner.learnerND import LearnerND
+from adaptive.learner.stacked_learner1D import StackedLearner1D
 from adaptive.learner.integrator_learner import IntegratorLearner
 from adaptive.learner.data_saver import DataSaver, make_datasaver
 
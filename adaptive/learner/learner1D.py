@@ -4,14 +4,14 @@ from copy import deepcopy
 import heapq
 import itertools
 import math
-from collections import Iterable
+from collections.abc import Iterable, MutableMapping
 
 import numpy as np
 import sortedcontainers
-import sortedcollections
 
 from adaptive.learner.base_learner import BaseLearner
 from adaptive.learner.learnerND import volume
+from adaptive.learner.sorted_array import ArrayNeighbors, ColumnarData
 from adaptive.learner.triangulation import simplex_volume_in_embedding
 from adaptive.notebook_integration import ensure_holoviews
 from adaptive.utils import cache_latest
@@ -69,6 +69,32 @@ def uses_nth_neighbors(n):
     return _wrapped
 
 
+def vectorized_loss(loss_per_interval):
+    """Decorator to mark a loss function as vectorized.
+
+    A vectorized loss function computes the losses of many intervals at
+    once. Instead of tuples it receives two arrays ``xs`` and ``ys``, with
+    one row per interval. ``xs`` has shape ``(n_intervals, 2 + 2 * nth_neighbors)``
+    and ``ys`` has shape ``(n_intervals, 2 + 2 * nth_neighbors)`` for scalar
+    output or ``(n_intervals, 2 + 2 * nth_neighbors, vdim)`` for vector
+    output. Missing neighbors are ``NaN`` (instead of `None`). It must
+    return an array with ``n_intervals`` losses.
+
+    The `~adaptive.Learner1D` then recomputes the losses of all
+    intervals (for example after a change of the scale or in
+    `~adaptive.Learner1D.tell_many`) with a single call.
+
+    Examples
+    --------
+    >>> @vectorized_loss
+    ... @uses_nth_neighbors(0)
+    ... def horizontal_distance_loss(xs, ys):
+    ...     return xs[:, 1] - xs[:, 0]
+    """
+    loss_per_interval.vectorized = True
+    return loss_per_interval
+
+
 @uses_nth_neighbors(0)
 def uniform_loss(xs, ys):
     """Loss function that samples the domain uniformly.
@@ -124,8 +150,76 @@ def triangle_loss(xs, ys):
     return sum(vol(pts[i:i+3]) for i in range(N)) / N
 
 
-def curvature_loss_function(area_factor=1, euclid_factor=0.02, horizontal_factor=0.02):
+@vectorized_loss
+@uses_nth_neighbors(0)
+def vectorized_uniform_loss(xs, ys):
+    """Vectorized version of `uniform_loss`."""
+    return xs[:, 1] - xs[:, 0]
+
+
+@vectorized_loss
+@uses_nth_neighbors(0)
+def vectorized_default_loss(xs, ys):
+    """Vectorized version of `default_loss`."""
+    dx = xs[:, 1] - xs[:, 0]
+    if ys.ndim == 3:
+        dy = np.abs(ys[:, 1] - ys[:, 0])
+        return np.hypot(dx[:, None], dy).max(axis=1)
+    else:
+        dy = ys[:, 1] - ys[:, 0]
+        return np.hypot(dx, dy)
+
+
+def _triangle_areas(pts):
+    """Areas of the triangles in ``pts``, an array
+    with shape ``(n_triangles, 3, dim)``."""
+    u = pts[:, 1] - pts[:, 0]
+    v = pts[:, 2] - pts[:, 0]
+    if pts.shape[2] == 2:
+        return np.abs(u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0]) / 2
+    uu = np.einsum('ij,ij->i', u, u)
+    vv = np.einsum('ij,ij->i', v, v)
+    uv = np.einsum('ij,ij->i', u, v)
+    return np.sqrt(np.maximum(uu * vv - uv**2, 0)) / 2
+
+
+@vectorized_loss
+@uses_nth_neighbors(1)
+def vectorized_triangle_loss(xs, ys):
+    """Vectorized version of `triangle_loss`."""
+    if ys.ndim == 2:
+        ys = ys[:, :, None]
+    pts = np.concatenate([xs[:, :, None], ys], axis=2)
+
+    has_left = ~np.isnan(xs[:, 0])
+    has_right = ~np.isnan(xs[:, 3])
+    N = has_left.astype(int) + has_right  # number of constructed triangles
+
+    with np.errstate(invalid='ignore'):
+        areas = (np.where(has_left, _triangle_areas(pts[:, 0:3]), 0)
+                 + np.where(has_right, _triangle_areas(pts[:, 1:4]), 0))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(N == 0, xs[:, 2] - xs[:, 1], areas / N)
+
+
+def curvature_loss_function(area_factor=1, euclid_factor=0.02,
+                            horizontal_factor=0.02, vectorized=False):
     # XXX: add a doc-string
+    if vectorized:
+        @vectorized_loss
+        @uses_nth_neighbors(1)
+        def curvature_loss(xs, ys):
+            xs_middle = xs[:, 1:3]
+            ys_middle = xs[:, 1:3]
+
+            triangle_loss_ = vectorized_triangle_loss(xs, ys)
+            default_loss_ = vectorized_default_loss(xs_middle, ys_middle)
+            dx = xs_middle[:, 1] - xs_middle[:, 0]
+            return (area_factor * (triangle_loss_**0.5)
+                    + euclid_factor * default_loss_
+                    + horizontal_factor * dx)
+        return curvature_loss
+
     @uses_nth_neighbors(1)
     def curvature_loss(xs, ys):
         xs_middle = xs[1:3]
@@ -152,7 +246,11 @@ def linspace(x_left, x_right, n):
         return [x_left + step * i for i in range(1, n)]
 
 
-def _get_neighbors_from_list(xs):
+def _get_neighbors_from_list(xs, compact=False):
+    if compact:
+        return ArrayNeighbors(xs)
+    if len(xs) == 0:
+        return sortedcontainers.SortedDict()
     xs = np.sort(xs)
     xs_left = np.roll(xs, 1).tolist()
     xs_right = np.roll(xs, -1).tolist()
@@ -186,10 +284,34 @@ class Learner1D(BaseLearner):
         A function that returns the loss for a single interval of the domain.
         If not provided, then a default is used, which uses the scaled distance
         in the x-y plane as the loss. See the notes for more details.
+    compact_neighbors : bool, default: False
+        If True, store the neighbors of the points in sorted arrays
+        (see `~adaptive.learner.sorted_array.ArrayNeighbors`) instead of
+        a ``SortedDict`` of lists. This uses much less memory and is
+        faster for learners with very many points.
+    lazy_rescaling : bool, default: False
+        If True, the losses are not all recomputed when the y-scale
+        changes. Instead, every loss remembers the scale epoch under which
+        it was computed and outdated losses are recomputed once they end up
+        at the top of the queue. This keeps the duration of `tell` constant
+        and gives the same ordering as recomputing all losses, as long as
+        the losses do not increase when the scale increases (which is the
+        case for all the loss functions in this module).
+    columnar_data : bool, default: False
+        If True, store 'data' in a `~adaptive.learner.sorted_array.ColumnarData`,
+        which keeps the points and values in contiguous ``float64`` arrays
+        instead of a dict with an array object per point. This is useful
+        for functions with vector output and many points. The values
+        in 'data' are then floats or arrays (copies).
+    vectorized_function : bool, default: False
+        If True, 'function' takes a 1D array of points and returns the
+        values of all the points, stacked along the first axis. Then
+        `~adaptive.runner.simple` and the runners evaluate `batch_size`
+        points with a single call of 'function', see `evaluate_batch`.
 
     Attributes
     ----------
-    data : dict
+    data : dict or `~adaptive.learner.sorted_array.ColumnarData`
         Sampled points and values.
     pending_points : set
         Points that still have to be evaluated.
@@ -214,10 +336,20 @@ class Learner1D(BaseLearner):
     If `loss_per_interval` doesn't  have such an attribute, it's assumed that is
     uses **no** neighboring intervals. Also see the `uses_nth_neighbors`
     decorator for more information.
+
+    If `loss_per_interval` is marked with the `vectorized_loss` decorator,
+    it receives arrays with the data of many intervals at once, such that
+    the losses of all intervals are recomputed with a single call.
     """
 
-    def __init__(self, function, bounds, loss_per_interval=None):
+    def __init__(self, function, bounds, loss_per_interval=None, *,
+                 compact_neighbors=False, lazy_rescaling=False,
+                 columnar_data=False, vectorized_function=False):
         self.function = function
+        self.vectorized_function = vectorized_function
+        self.compact_neighbors = compact_neighbors
+        self.lazy_rescaling = lazy_rescaling
+        self.columnar_data = columnar_data
 
         if hasattr(loss_per_interval, 'nth_neighbors'):
             self.nth_neighbors = loss_per_interval.nth_neighbors
@@ -225,6 +357,8 @@ class Learner1D(BaseLearner):
             self.nth_neighbors = 0
 
         self.loss_per_interval = loss_per_interval or default_loss
+        self._vectorized_loss = getattr(self.loss_per_interval,
+                                        'vectorized', False)
 
 
         # When the scale changes by a factor 2, the losses are
@@ -232,13 +366,14 @@ class Learner1D(BaseLearner):
         # the learners behavior in the tests.
         self._recompute_losses_factor = 2
 
-        self.data = {}
+        self.data = ColumnarData() if columnar_data else {}
         self.pending_points = set()
 
         # A dict {x_n: [x_{n-1}, x_{n+1}]} for quick checking of local
         # properties.
-        self.neighbors = sortedcontainers.SortedDict()
-        self.neighbors_combined = sortedcontainers.SortedDict()
+        self.neighbors = _get_neighbors_from_list([], compact_neighbors)
+        self.neighbors_combined = _get_neighbors_from_list(
+            [], compact_neighbors)
 
         # Bounding box [[minx, maxx], [miny, maxy]].
         self._bbox = [list(bounds), [np.inf, -np.inf]]
@@ -247,6 +382,14 @@ class Learner1D(BaseLearner):
         self._scale = [bounds[1] - bounds[0], 0]
         self._oldscale = deepcopy(self._scale)
 
+        # Incremented every time the losses should be recomputed, with
+        # 'lazy_rescaling' we store the epoch of each "real" interval.
+        self._scale_epoch = 0
+        self._loss_epochs = {}
+
+        # The state of '_greedy_quals', reset whenever the losses change.
+        self._allocation = None
+
         # A LossManager storing the loss function for each interval x_n.
         self.losses = loss_manager(self._scale[0])
         self.losses_combined = loss_manager(self._scale[0])
@@ -258,6 +401,10 @@ class Learner1D(BaseLearner):
 
         self._vdim = None
 
+        # The sorted points and values used by 'interpolate',
+        # reset whenever 'data' changes.
+        self._sorted_data = None
+
     @property
     def vdim(self):
         """Length of the output of ``learner.function``.
@@ -283,14 +430,71 @@ class Learner1D(BaseLearner):
         """Number of evaluated points."""
         return len(self.data)
 
+    @property
+    def batch_size(self):
+        """The number of points that is evaluated with a single call of a
+        vectorized 'function'.
+
+        The points of a batch are chosen with the losses of the points that
+        are known before the batch, which is a good approximation of choosing
+        the points one by one as long as the batch is small compared to the
+        number of points. Therefore the batch grows with the number of points.
+        """
+        return max(10, self.npoints // 4)
+
+    def evaluate_batch(self, n=None):
+        """Evaluate 'n' new points with a single call of a vectorized
+        'function' and tell the results to the learner.
+
+        Parameters
+        ----------
+        n : int, optional
+            The number of points, by default `batch_size`.
+        """
+        if not self.vectorized_function:
+            raise ValueError("'function' is not vectorized, "
+                             "set 'vectorized_function=True'.")
+        xs, _ = self.ask(self.batch_size if n is None else n)
+        if xs:
+            ys = self.function(np.array(xs, dtype=float))
+            self.tell_many(xs, ys)
+
     @cache_latest
     def loss(self, real=True):
         losses = self.losses if real else self.losses_combined
         if not losses:
             return np.inf
-        max_interval, max_loss = losses.peekitem(0)
+        max_interval, max_loss = self._peekitem(losses, 0)
         return max_loss
 
+    def _peekitem(self, losses, i):
+        """Return ``losses.peekitem(i)``, with 'lazy_rescaling' the
+        outdated losses that end up at index ``i`` are recomputed first."""
+        if not self.lazy_rescaling:
+            return losses.peekitem(i)
+        while True:
+            ival, loss = losses.peekitem(i)
+            real_ival = self._real_interval(ival)
+            if (real_ival is None or self._scale_epoch
+                    == self._loss_epochs.get(real_ival, self._scale_epoch)):
+                return ival, loss
+            self._update_interpolated_loss_in_interval(*real_ival)
+
+    def _real_interval(self, ival):
+        """Return the "real" interval that contains the (interpolated)
+        interval ``ival``, or None if there is no such interval."""
+        a, b = ival
+        if a in self.neighbors:
+            x_left = a
+        else:
+            x_left, _ = self._find_neighbors(a, self.neighbors)
+        if x_left is None:
+            return None
+        x_right = self.neighbors[x_left][1]
+        if x_right is None or x_right < b:
+            return None
+        return x_left, x_right
+
     def _scale_x(self, x):
         if x is None:
             return None
@@ -324,15 +528,84 @@ class Learner1D(BaseLearner):
         xs_scaled = tuple(self._scale_x(x) for x in xs)
         ys_scaled = tuple(self._scale_y(y) for y in ys)
 
+        if self._vectorized_loss:
+            missing_y = np.full(np.shape(ys_scaled[nn]), np.nan)
+            xs_scaled = [np.nan if x is None else x for x in xs_scaled]
+            ys_scaled = [missing_y if y is None else y for y in ys_scaled]
+            loss = self.loss_per_interval(np.array([xs_scaled], dtype=float),
+                                          np.array([ys_scaled], dtype=float))
+            return float(loss[0])
+
         # we need to compute the loss for this interval
         return self.loss_per_interval(xs_scaled, ys_scaled)
 
+    def _get_losses_in_intervals(self, intervals):
+        """Compute the losses of several real intervals.
+
+        If ``loss_per_interval`` is vectorized this is a single call
+        to the loss function, otherwise it is called for every interval.
+        """
+        if not self._vectorized_loss or not intervals:
+            return [self._get_loss_in_interval(*ival) for ival in intervals]
+
+        # Gather the interval together with its 'nth_neighbors'
+        # nearest neighboring intervals, missing neighbors are NaN.
+        nn = self.nth_neighbors
+        if 2 * len(intervals) > len(self.neighbors):
+            # Take the windows from arrays with all points.
+            points = list(self.neighbors)
+            xs = np.array(points, dtype=float)
+            if self.columnar_data:
+                data_xs, data_ys = self.data.arrays()
+                ys = data_ys[np.searchsorted(data_xs, xs)]
+            else:
+                ys = np.array([self.data[x] for x in points], dtype=float)
+            x_lefts = np.array([x_left for x_left, _ in intervals],
+                               dtype=float)
+            window = (np.searchsorted(xs, x_lefts)[:, None]
+                      + np.arange(-nn, nn + 2))
+            missing = (window < 0) | (window >= len(xs))
+            window = np.clip(window, 0, len(xs) - 1)
+            xs, ys = xs[window], ys[window]
+        else:
+            # Only look up the points around 'intervals'.
+            windows = []
+            for x_left, _ in intervals:
+                i = self.neighbors.index(x_left)
+                windows.append([self._get_point_by_index(j)
+                                for j in range(i - nn, i + nn + 2)])
+            missing = np.array([[x is None for x in window]
+                                for window in windows])
+            # The missing points get the value of the interval's left
+            # point, they are replaced by NaN below.
+            xs = np.array([[window[nn] if x is None else x for x in window]
+                           for window in windows], dtype=float)
+            ys = np.array([[self.data[window[nn] if x is None else x]
+                            for x in window] for window in windows],
+                          dtype=float)
+
+        xs_scaled = xs / self._scale[0]
+        ys_scaled = ys / (self._scale[1] or 1)
+        xs_scaled[missing] = np.nan
+        ys_scaled[missing] = np.nan
+
+        losses = np.asarray(self.loss_per_interval(xs_scaled, ys_scaled),
+                            dtype=float)
+        dx = xs[:, nn + 1] - xs[:, nn]
+        losses[dx < self._dx_eps] = 0
+        return losses.tolist()
+
     def _update_interpolated_loss_in_interval(self, x_left, x_right):
         if x_left is None or x_right is None:
             return
 
         loss = self._get_loss_in_interval(x_left, x_right)
+        self._set_interpolated_loss_in_interval(x_left, x_right, loss)
+
+    def _set_interpolated_loss_in_interval(self, x_left, x_right, loss):
         self.losses[x_left, x_right] = loss
+        if self.lazy_rescaling:
+            self._loss_epochs[x_left, x_right] = self._scale_epoch
 
         # Iterate over all interpolated intervals in between
         # x_left and x_right and set the newly interpolated loss.
@@ -345,6 +618,7 @@ class Learner1D(BaseLearner):
 
     def _update_losses(self, x, real=True):
         """Update all losses that depend on x"""
+        self._allocation = None
         # When we add a new point x, we should update the losses
         # (x_left, x_right) are the "real" neighbors of 'x'.
         x_left, x_right = self._find_neighbors(x, self.neighbors)
@@ -366,6 +640,7 @@ class Learner1D(BaseLearner):
             # Since 'x' is in between (x_left, x_right),
             # we get rid of the interval.
             self.losses.pop((x_left, x_right), None)
+            self._loss_epochs.pop((x_left, x_right), None)
             self.losses_combined.pop((x_left, x_right), None)
         elif x_left is not None and x_right is not None:
             # 'x' happens to be in between two real points,
@@ -401,8 +676,10 @@ class Learner1D(BaseLearner):
         if x not in neighbors:  # The point is new
             x_left, x_right = self._find_neighbors(x, neighbors)
             neighbors[x] = [x_left, x_right]
-            neighbors.get(x_left, [None, None])[1] = x
-            neighbors.get(x_right, [None, None])[0] = x
+            if not self.compact_neighbors:
+                # `ArrayNeighbors` derives the neighbors from the ordering.
+                neighbors.get(x_left, [None, None])[1] = x
+                neighbors.get(x_right, [None, None])[0] = x
 
     def _update_scale(self, x, y):
         """Update the scale with which the x and y-values are scaled.
@@ -418,13 +695,16 @@ class Learner1D(BaseLearner):
         self._scale[0] = self._bbox[0][1] - self._bbox[0][0]
         if y is not None:
             if self.vdim > 1:
-                try:
-                    y_min = np.min([self._bbox[1][0], y], axis=0)
-                    y_max = np.max([self._bbox[1][1], y], axis=0)
-                except ValueError:
-                    # Happens when `_bbox[1]` is a float and `y` a vector.
-                    y_min = y_max = y
-                self._bbox[1] = [y_min, y_max]
+                y_min, y_max = self._bbox[1]
+                if np.ndim(y_min) == 0:
+                    # The first value, `_bbox[1]` is still [inf, -inf].
+                    y_min = np.array(y, dtype=float)
+                    y_max = np.array(y, dtype=float)
+                    self._bbox[1] = [y_min, y_max]
+                else:
+                    # Update the running minimum and maximum in place.
+                    np.minimum(y_min, y, out=y_min)
+                    np.maximum(y_max, y, out=y_max)
                 self._scale[1] = np.max(y_max - y_min)
             else:
                 self._bbox[1][0] = min(self._bbox[1][0], y)
@@ -435,6 +715,19 @@ class Learner1D(BaseLearner):
         if x in self.data:
             # The point is already evaluated before
             return
+        y = self._add_to_data(x, y)
+
+        if not self.bounds[0] <= x <= self.bounds[1]:
+            return
+
+        self._update_neighbors(x, self.neighbors_combined)
+        self._update_neighbors(x, self.neighbors)
+        self._update_scale(x, y)
+        self._update_losses(x, real=True)
+        self._recompute_losses_if_rescaled()
+
+    def _add_to_data(self, x, y):
+        """Add a new point to 'data' and return its value."""
         if y is None:
             raise TypeError("Y-value may not be None, use learner.tell_pending(x)"
                 "to indicate that this value is currently being calculated")
@@ -445,25 +738,127 @@ class Learner1D(BaseLearner):
 
         # Add point to the real data dict
         self.data[x] = y
+        self._sorted_data = None
 
         # remove from set of pending points
         self.pending_points.discard(x)
+        return y
 
-        if not self.bounds[0] <= x <= self.bounds[1]:
-            return
-
-        self._update_neighbors(x, self.neighbors_combined)
-        self._update_neighbors(x, self.neighbors)
-        self._update_scale(x, y)
-        self._update_losses(x, real=True)
-
+    def _recompute_losses_if_rescaled(self):
         # If the scale has increased enough, recompute all losses.
         if self._scale[1] > self._recompute_losses_factor * self._oldscale[1]:
-            for interval in reversed(self.losses):
-                self._update_interpolated_loss_in_interval(*interval)
+            self._scale_epoch += 1
+            if not self.lazy_rescaling:
+                intervals = list(self.losses)
+                losses = self._get_losses_in_intervals(intervals)
+                for interval, loss in zip(intervals, losses):
+                    self._set_interpolated_loss_in_interval(*interval, loss)
 
             self._oldscale = deepcopy(self._scale)
 
+    def _merge_many(self, xs, ys):
+        """Add several points to the existing intervals.
+
+        The (sorted) points are inserted one by one into the neighbors,
+        then the losses of the intervals that changed, and of their
+        'nth_neighbors' nearest neighbors, are computed at once.
+        Unlike calling 'tell' for every point this computes the losses
+        only once and with the final scale.
+        """
+        self._allocation = None
+        new_points = []
+        for x, y in zip(xs, ys):
+            if x in self.data:
+                continue
+            y = self._add_to_data(x, y)
+            if self.bounds[0] <= x <= self.bounds[1]:
+                new_points.append(x)
+                self._update_scale(x, y)
+        if not new_points:
+            return
+
+        new_points.sort()
+        for x in new_points:
+            # Remove the intervals that 'x' splits.
+            x_left, x_right = self._find_neighbors(x, self.neighbors)
+            a, b = self._find_neighbors(x, self.neighbors_combined)
+            self.losses_combined.pop((a, b), None)
+            self.losses.pop((x_left, x_right), None)
+            self.losses_combined.pop((x_left, x_right), None)
+            self._loss_epochs.pop((x_left, x_right), None)
+            self._update_neighbors(x, self.neighbors_combined)
+            self._update_neighbors(x, self.neighbors)
+
+        intervals = sorted({ival for x in new_points for ival in
+                            _get_intervals(x, self.neighbors,
+                                           self.nth_neighbors)})
+        losses = self._get_losses_in_intervals(intervals)
+        for interval, loss in zip(intervals, losses):
+            self._set_interpolated_loss_in_interval(*interval, loss)
+
+        # The intervals in between a new outermost "real" point
+        # and a pending point have an unknown loss.
+        x = new_points[0]
+        a, _ = self.neighbors_combined[x]
+        if self.neighbors[x][0] is None and a is not None:
+            self.losses_combined[a, x] = float('inf')
+        x = new_points[-1]
+        _, b = self.neighbors_combined[x]
+        if self.neighbors[x][1] is None and b is not None:
+            self.losses_combined[x, b] = float('inf')
+
+        self._recompute_losses_if_rescaled()
+
+    def _data_arrays(self):
+        """Return the points and values in 'data' as arrays."""
+        if self.columnar_data:
+            return self.data.arrays()
+        points = np.array(list(self.data.keys()))
+        values = np.array(list(self.data.values()), dtype=float)
+        return points, values
+
+    def interpolate(self, xs):
+        """Evaluate the piecewise linear interpolation of the data.
+
+        The sorted data is cached until new data is added, such that
+        repeated calls only cost a binary search per point.
+
+        Parameters
+        ----------
+        xs : float or array-like
+            The points at which to interpolate.
+
+        Returns
+        -------
+        ys : numpy.ndarray
+            Array with shape ``np.shape(xs)`` for scalar output and
+            ``np.shape(xs) + (vdim,)`` for vector output. Points outside
+            of the range of the data are NaN.
+        """
+        if self._sorted_data is None:
+            points, values = self._data_arrays()
+            if not self.columnar_data:
+                order = np.argsort(points)
+                points, values = points[order], values[order]
+            self._sorted_data = points.astype(float), values
+        points, values = self._sorted_data
+
+        xs = np.asarray(xs, dtype=float)
+        value_shape = values.shape[1:] if len(values) else ()
+        if len(points) < 2:
+            ys = np.full(xs.shape + value_shape, np.nan)
+            if len(points) == 1:
+                ys[xs == points[0]] = values[0]
+            return ys
+
+        i = np.clip(np.searchsorted(points, xs, side='right') - 1,
+                    0, len(points) - 2)
+        x_left, x_right = points[i], points[i + 1]
+        t = (xs - x_left) / (x_right - x_left)
+        t = np.where((xs < points[0]) | (xs > points[-1]), np.nan, t)
+        t = t.reshape(t.shape + (1,) * len(value_shape))
+        return values[i] + t * (values[i + 1] - values[i])
+
     def tell_pending(self, x):
         if x in self.data:
             # The point is already evaluated before
@@ -474,26 +869,34 @@ class Learner1D(BaseLearner):
 
     def tell_many(self, xs, ys, *, force=False):
         if not force and not (len(xs) > 0.5 * len(self.data) and len(xs) > 2):
-            # Only run this more efficient method if there are
-            # at least 2 points and the amount of points added are
-            # at least half of the number of points already in 'data'.
-            # These "magic numbers" are somewhat arbitrary.
-            super().tell_many(xs, ys)
+            # Only rebuild everything if there are at least 2 points
+            # and the amount of points added are at least half of the
+            # number of points already in 'data'. These "magic numbers"
+            # are somewhat arbitrary. Otherwise the points are merged
+            # into the existing intervals.
+            if len(xs) > 1:
+                self._merge_many(xs, ys)
+            else:
+                super().tell_many(xs, ys)
             return
 
+        self._allocation = None
+
         # Add data points
         self.data.update(zip(xs, ys))
         self.pending_points.difference_update(xs)
+        self._sorted_data = None
 
         # Get all data as numpy arrays
-        points = np.array(list(self.data.keys()))
-        values = np.array(list(self.data.values()))
+        points, values = self._data_arrays()
         points_pending = np.array(list(self.pending_points))
         points_combined = np.hstack([points_pending, points])
 
         # Generate neighbors
-        self.neighbors = _get_neighbors_from_list(points)
-        self.neighbors_combined = _get_neighbors_from_list(points_combined)
+        self.neighbors = _get_neighbors_from_list(
+            points, self.compact_neighbors)
+        self.neighbors_combined = _get_neighbors_from_list(
+            points_combined, self.compact_neighbors)
 
         # Update scale
         self._bbox[0] = [points_combined.min(), points_combined.max()]
@@ -509,8 +912,11 @@ class Learner1D(BaseLearner):
 
         # The the losses for the "real" intervals.
         self.losses = loss_manager(self._scale[0])
-        for ival in intervals:
-            self.losses[ival] = self._get_loss_in_interval(*ival)
+        for ival, loss in zip(intervals,
+                              self._get_losses_in_intervals(intervals)):
+            self.losses[ival] = loss
+        if self.lazy_rescaling:
+            self._loss_epochs = dict.fromkeys(intervals, self._scale_epoch)
 
         # List with "real" intervals that have interpolated intervals inside
         to_interpolate = []
@@ -519,7 +925,7 @@ class Learner1D(BaseLearner):
         for ival in intervals_combined:
             # If this interval exists in 'losses' then copy it otherwise
             # calculate it.
-            if ival in reversed(self.losses):
+            if ival in self.losses:
                 self.losses_combined[ival] = self.losses[ival]
             else:
                 # Set all losses to inf now, later they might be udpdated if the
@@ -534,7 +940,7 @@ class Learner1D(BaseLearner):
                     to_interpolate.append((x_left, x_right))
 
         for ival in to_interpolate:
-            if ival in reversed(self.losses):
+            if ival in self.losses:
                 # If this interval does not exist it should already
                 # have an inf loss.
                 self._update_interpolated_loss_in_interval(*ival)
@@ -575,34 +981,14 @@ class Learner1D(BaseLearner):
             # We don't have any points, so return a linspace with 'n' points.
             return np.linspace(*self.bounds, n).tolist(), [np.inf] * n
 
-        quals = loss_manager(self._scale[0])
-        if len(missing_bounds) > 0:
-            # There is at least one point in between the bounds.
-            all_points = list(self.data.keys()) + list(self.pending_points)
-            intervals = [(self.bounds[0], min(all_points)),
-                         (max(all_points), self.bounds[1])]
-            for interval, bound in zip(intervals, self.bounds):
-                if bound in missing_bounds:
-                    quals[(*interval, 1)] = np.inf
-
         points_to_go = n - len(missing_bounds)
 
         # Calculate how many points belong to each interval.
-        i, i_max = 0, len(self.losses_combined)
-        for _ in range(points_to_go):
-            qual, loss_qual = quals.peekitem(0) if quals else (None, 0)
-            ival, loss_ival = self.losses_combined.peekitem(i) if i < i_max else (None, 0)
-
-            if (qual is None
-                or (ival is not None
-                    and self._loss(self.losses_combined, ival)
-                        >= self._loss(quals, qual))):
-                i += 1
-                quals[(*ival, 2)] = loss_ival / 2
-            else:
-                quals.pop(qual, None)
-                *xs, n = qual
-                quals[(*xs, n+1)] = loss_qual * n / (n+1)
+        if (not missing_bounds and points_to_go > 100
+                and points_to_go > len(self.losses_combined) / 10):
+            quals = self._water_filling_quals(points_to_go)
+        else:
+            quals = self._greedy_quals(missing_bounds, points_to_go)
 
         points = list(itertools.chain.from_iterable(
             linspace(*ival, n) for (*ival, n) in quals))
@@ -617,6 +1003,86 @@ class Learner1D(BaseLearner):
 
         return points, loss_improvements
 
+    def _greedy_quals(self, missing_bounds, n):
+        """Divide 'n' points over the intervals, one at a time.
+
+        Every point is added to the interval with the largest loss per
+        subinterval, the first candidates are the intervals from
+        'losses_combined' that have no points added yet. The allocation
+        is kept until the learner changes, such that subsequent calls
+        only allocate the points that were not allocated before."""
+        if self._allocation is not None and self._allocation[2] <= n:
+            quals, i, n_allocated = self._allocation
+        else:
+            quals, i, n_allocated = loss_manager(self._scale[0]), 0, 0
+            if len(missing_bounds) > 0:
+                # There is at least one point in between the bounds.
+                all_points = list(self.data.keys()) + list(self.pending_points)
+                intervals = [(self.bounds[0], min(all_points)),
+                             (max(all_points), self.bounds[1])]
+                for interval, bound in zip(intervals, self.bounds):
+                    if bound in missing_bounds:
+                        quals[(*interval, 1)] = np.inf
+
+        i_max = len(self.losses_combined)
+        for _ in range(n - n_allocated):
+            qual, loss_qual = quals.peekitem(0) if quals else (None, 0)
+            ival, loss_ival = (self._peekitem(self.losses_combined, i)
+                               if i < i_max else (None, 0))
+
+            if (qual is None
+                or (ival is not None
+                    and self._loss(self.losses_combined, ival)
+                        >= self._loss(quals, qual))):
+                i += 1
+                quals[(*ival, 2)] = loss_ival / 2
+            else:
+                quals.pop(qual, None)
+                *xs, n_parts = qual
+                quals[(*xs, n_parts + 1)] = loss_qual * n_parts / (n_parts + 1)
+
+        self._allocation = (quals, i, n)
+        return quals
+
+    def _water_filling_quals(self, n):
+        """Divide 'n' points over the intervals at once.
+
+        This gives the same allocation as `_greedy_quals` (up to ties) but
+        it takes a few NumPy operations on all intervals instead of a
+        Python loop over the points."""
+        self._refresh_outdated_losses()
+        losses = self.losses_combined
+        ivals = list(losses)
+        loss_values = np.array([losses[ival] for ival in ivals], dtype=float)
+
+        # The same as 'finite_loss' but for all intervals at once.
+        x_left, x_right = np.array(ivals, dtype=float).T
+        finite_losses = np.where(np.isinf(loss_values),
+                                 (x_right - x_left) / self._scale[0],
+                                 loss_values)
+        finite_losses = np.floor(finite_losses * 1e12 + 0.5) / 1e12
+        if not finite_losses.max() > 0:
+            return self._greedy_quals([], n)
+
+        n_points = _water_filling(finite_losses, n)
+        quals = loss_manager(self._scale[0])
+        for j in np.flatnonzero(n_points):
+            n_parts = int(n_points[j]) + 1
+            quals[(*ivals[j], n_parts)] = loss_values[j] / n_parts
+        return quals
+
+    def _refresh_outdated_losses(self):
+        """Recompute all losses that are outdated by 'lazy_rescaling'."""
+        if not self.lazy_rescaling:
+            return
+        intervals = [ival for ival, epoch in self._loss_epochs.items()
+                     if epoch != self._scale_epoch]
+        if intervals:
+            self._allocation = None
+        losses = self._get_losses_in_intervals(intervals)
+        for interval, loss in zip(intervals, losses):
+            self._set_interpolated_loss_in_interval(*interval, loss)
+
     def _loss(self, mapping, ival):
         loss = mapping[ival]
         return finite_loss(ival, loss, self._scale[0])
@@ -633,6 +1099,13 @@ class Learner1D(BaseLearner):
         hv = ensure_holoviews()
         if not self.data:
             p = hv.Scatter([]) * hv.Path([])
+        elif self.columnar_data:
+            # The arrays are already sorted.
+            xs, ys = self.data.arrays()
+            if self.vdim > 1:
+                p = hv.Path((xs, ys)) * hv.Scatter([])
+            else:
+                p = hv.Scatter((xs, ys)) * hv.Path([])
         elif not self.vdim > 1:
             p = hv.Scatter(self.data) * hv.Path([])
         else:
@@ -646,6 +1119,7 @@ class Learner1D(BaseLearner):
         return p.redim(x=dict(range=plot_bounds))
 
     def remove_unfinished(self):
+        self._allocation = None
         self.pending_points = set()
         self.losses_combined = deepcopy(self.losses)
         self.neighbors_combined = deepcopy(self.neighbors)
@@ -657,12 +1131,145 @@ class Learner1D(BaseLearner):
         self.tell_many(*zip(*data.items()))
 
 
+class LossManager(MutableMapping):
+    """A mapping ``{interval: loss}`` that is ordered by decreasing loss.
+
+    The items are ordered on ``(-finite_loss, interval)``, which is
+    computed once when an item is set. The order is maintained with a
+    binary heap with lazy deletion: changing or removing an item leaves
+    its old heap entry in place, which is skipped (and eventually
+    discarded) when it reaches the top.
+
+    Parameters
+    ----------
+    x_scale : float
+        The scale that is passed to `finite_loss`.
+    """
+
+    def __init__(self, x_scale):
+        self.x_scale = x_scale
+        # {interval: (-finite_loss, interval, loss)}, the heap contains
+        # the same tuples, the ones that are not in '_entries' are removed.
+        self._entries = {}
+        self._heap = []
+        # Items in sorted order, used by 'peekitem(i)' with i > 0.
+        self._sorted = None
+
+    def __getitem__(self, ival):
+        return self._entries[ival][2]
+
+    def _priority(self, ival, loss):
+        finite, _ = finite_loss(ival, loss, self.x_scale)
+        return -finite
+
+    def __setitem__(self, ival, loss):
+        entry = (self._priority(ival, loss), ival, loss)
+        self._entries[ival] = entry
+        heapq.heappush(self._heap, entry)
+        self._sorted = None
+        self._maybe_compact()
+
+    def __delitem__(self, ival):
+        del self._entries[ival]
+        self._sorted = None
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        # Rebuild the heap when most of its entries are removed ones.
+        if len(self._heap) > 2 * len(self._entries) + 100:
+            self._heap = list(self._entries.values())
+            heapq.heapify(self._heap)
+
+    def __contains__(self, ival):
+        return ival in self._entries
+
+    def __iter__(self):
+        # In order of priority, like a sorted dict.
+        return (ival for _, ival, _ in sorted(self._entries.values()))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _is_alive(self, entry):
+        return self._entries.get(entry[1]) is entry
+
+    def peekitem(self, index=0):
+        """Return the ``(interval, loss)`` pair at ``index``
+        in the ordering, without removing it.
+
+        Peeking at the first item is O(1) (amortized), looking at
+        the first ``k`` items in turn costs O(k log k).
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('LossManager index out of range')
+
+        heap = self._heap
+        while not self._is_alive(heap[0]):
+            heapq.heappop(heap)
+            self._sorted = None
+        if index == 0:
+            _, ival, loss = heap[0]
+            return ival, loss
+
+        # Walk the heap tree in order of increasing entries.
+        if self._sorted is None:
+            self._sorted = ([], [(heap[0], 0)])
+        items, frontier = self._sorted
+        while len(items) <= index:
+            entry, i = heapq.heappop(frontier)
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+            if self._is_alive(entry):
+                items.append(entry)
+        _, ival, loss = items[index]
+        return ival, loss
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, dict(self.items()))
+
+
 def loss_manager(x_scale):
-    def sort_key(ival, loss):
-        loss, ival = finite_loss(ival, loss, x_scale)
-        return -loss, ival
-    sorted_dict = sortedcollections.ItemSortedDict(sort_key)
-    return sorted_dict
+    return LossManager(x_scale)
+
+
+def _water_filling(losses, n):
+    """Distribute 'n' points over intervals with 'losses'.
+
+    Returns the number of points that is added to every interval, such
+    that the result is the same (up to ties) as adding the points one at
+    a time to the interval with the largest 'loss / (n_points + 1)'.
+    That is, the points go to the 'n' largest values of 'loss / k' for
+    'k = 1, 2, ...', so we search for the threshold 't' at which
+    'sum(floor(losses / t))' becomes 'n'.
+    """
+    losses = np.asarray(losses, dtype=float)
+    lo, hi = losses.max() / (n + 1), 2 * losses.max()
+    for _ in range(100):
+        mid = (lo + hi) / 2
+        if not lo < mid < hi:
+            break
+        if np.floor(losses / mid).sum() >= n:
+            lo = mid
+        else:
+            hi = mid
+
+    # All points with 'loss / k >= hi', these are less than 'n' points.
+    n_points = np.floor(losses / hi).astype(int)
+
+    # The remaining points go to the (nearly) tied intervals
+    # that have their next point in between 'lo' and 'hi'.
+    remaining = n - n_points.sum()
+    candidates = np.flatnonzero(np.floor(losses / lo) > n_points)
+    next_losses = losses[candidates] / (n_points[candidates] + 1)
+    order = np.argsort(-next_losses, kind='mergesort')
+    n_points[candidates[order[:remaining]]] += 1
+
+    for _ in range(n - n_points.sum()):
+        n_points[np.argmax(losses / (n_points + 1))] += 1
+    return n_points
 
 
 def finite_loss(ival, loss, x_scale):
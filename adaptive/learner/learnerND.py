@@ -14,7 +14,7 @@ from sortedcontainers import SortedKeyList
 from adaptive.learner.base_learner import BaseLearner
 from adaptive.notebook_integration import ensure_holoviews, ensure_plotly
 from adaptive.learner.triangulation import (
-    Triangulation, point_in_simplex, circumsphere,
+    Triangulation, CompactTriangulation, point_in_simplex, circumsphere,
     simplex_volume_in_embedding, fast_det)
 from adaptive.utils import restore, cache_latest
 
@@ -126,7 +126,10 @@ class LearnerND(BaseLearner):
         If not provided, then a default is used, which uses
         the deviation from a linear estimate, as well as
         triangle area, to determine the loss.
-
+    compact_triangulation : bool, default: False
+        Whether to store the triangulation in arrays, using a
+        `~adaptive.learner.triangulation.CompactTriangulation`. This uses
+        several times less memory, but makes adding points slower.
 
     Attributes
     ----------
@@ -160,7 +163,8 @@ class LearnerND(BaseLearner):
     children based on volume.
     """
 
-    def __init__(self, func, bounds, loss_per_simplex=None):
+    def __init__(self, func, bounds, loss_per_simplex=None, *,
+                 compact_triangulation=False):
         self._vdim = None
         self.loss_per_simplex = loss_per_simplex or default_loss
         self.data = OrderedDict()
@@ -179,6 +183,7 @@ class LearnerND(BaseLearner):
 
         self.function = func
         self._tri = None
+        self.compact_triangulation = compact_triangulation
         self._losses = dict()
 
         self._pending_to_simplex = dict()  # vertex → simplex
@@ -250,7 +255,10 @@ class LearnerND(BaseLearner):
             return self._tri
 
         try:
-            self._tri = Triangulation(self.points)
+            if self.compact_triangulation:
+                self._tri = CompactTriangulation(self.points)
+            else:
+                self._tri = Triangulation(self.points)
             self._update_losses(set(), self._tri.simplices)
             return self._tri
         except ValueError:
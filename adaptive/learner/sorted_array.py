@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_left, bisect_right
+from collections.abc import MutableMapping
+import itertools
+
+import numpy as np
+
+
+class SortedArray:
+    """A sorted set of floats stored in chunked ``float64`` arrays.
+
+    Every chunk is a preallocated array of ``2 * load`` elements of which
+    the first ``size`` are in use; a chunk is split in two when it is
+    full. Lookups take O(log n) and insertions O(log n + load) without
+    storing a Python object per element.
+
+    Parameters
+    ----------
+    xs : 1D array-like, optional
+        Initial elements, duplicates are removed.
+    load : int, default: 1000
+        Half of the capacity of a chunk.
+    """
+
+    def __init__(self, xs=(), load=1000):
+        self._load = load
+        self._values = None
+        xs = np.unique(np.asarray(xs, dtype=float))
+        self._chunks = []
+        self._sizes = []
+        self._maxes = []
+        for start in range(0, len(xs), load):
+            part = xs[start:start + load]
+            self._append_chunk(part)
+        self._offsets = np.cumsum([0] + self._sizes[:-1], dtype=np.int64)
+        self._len = len(xs)
+
+    def _append_chunk(self, part, values=None):
+        chunk = np.empty(2 * self._load)
+        chunk[:len(part)] = part
+        self._chunks.append(chunk)
+        self._sizes.append(len(part))
+        self._maxes.append(float(part[-1]))
+        if self._values is not None:
+            column = np.empty((2 * self._load,) + self._value_shape)
+            column[:len(part)] = values
+            self._values.append(column)
+
+    def _locate(self, x):
+        """Return the chunk index and the position in that chunk
+        of the leftmost insertion point of ``x``."""
+        k = bisect_left(self._maxes, x)
+        if k == len(self._maxes):
+            if k == 0:
+                return 0, 0
+            k -= 1
+            return k, self._sizes[k]
+        chunk = self._chunks[k][:self._sizes[k]]
+        return k, int(np.searchsorted(chunk, x))
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, x):
+        k = bisect_left(self._maxes, x)
+        if k == len(self._maxes):
+            return False
+        chunk = self._chunks[k][:self._sizes[k]]
+        return chunk[np.searchsorted(chunk, x)] == x
+
+    def __iter__(self):
+        for chunk, size in zip(self._chunks, self._sizes):
+            yield from chunk[:size].tolist()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step != 1:
+                return self.to_array()[index].tolist()
+            return self._slice(start, stop).tolist()
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError('index out of range')
+        k = bisect_right(self._offsets, index) - 1
+        return float(self._chunks[k][index - self._offsets[k]])
+
+    def _slice(self, start, stop):
+        if start >= stop:
+            return np.empty(0)
+        k_start = bisect_right(self._offsets, start) - 1
+        k_stop = bisect_right(self._offsets, stop - 1) - 1
+        parts = []
+        for k in range(k_start, k_stop + 1):
+            offset = self._offsets[k]
+            lo = max(start - offset, 0)
+            hi = min(stop - offset, self._sizes[k])
+            parts.append(self._chunks[k][lo:hi])
+        return np.concatenate(parts)
+
+    def bisect_left(self, x):
+        """Return the index where ``x`` would be inserted."""
+        if not self._chunks:
+            return 0
+        k, pos = self._locate(x)
+        return int(self._offsets[k]) + pos
+
+    def index(self, x):
+        """Return the index of ``x``, raises `ValueError` if it is absent."""
+        if x not in self:
+            raise ValueError('{} is not in SortedArray'.format(x))
+        return self.bisect_left(x)
+
+    def add(self, x):
+        """Insert ``x``, does nothing if it is already present."""
+        if x in self:
+            return
+        self._insert(x)
+
+    def discard(self, x):
+        """Remove ``x``, does nothing if it is absent."""
+        if x not in self:
+            return
+        k, pos = self._locate(x)
+        size = self._sizes[k] - 1
+        chunk = self._chunks[k]
+        chunk[pos:size] = chunk[pos + 1:size + 1]
+        if self._values is not None:
+            column = self._values[k]
+            column[pos:size] = column[pos + 1:size + 1]
+        self._len -= 1
+        if size == 0:
+            del self._chunks[k], self._sizes[k], self._maxes[k]
+            if self._values is not None:
+                del self._values[k]
+            self._offsets = np.delete(self._offsets, k)
+            self._offsets[k:] -= 1
+            return
+        self._sizes[k] = size
+        self._maxes[k] = float(chunk[size - 1])
+        self._offsets[k + 1:] -= 1
+
+    def _insert(self, x, value=None):
+        # 'x' must not be present yet.
+        if not self._chunks:
+            self._append_chunk(np.array([x], dtype=float), value)
+            self._offsets = np.zeros(1, dtype=np.int64)
+            self._len = 1
+            return
+
+        k, pos = self._locate(x)
+        chunk, size = self._chunks[k], self._sizes[k]
+        chunk[pos + 1:size + 1] = chunk[pos:size]
+        chunk[pos] = x
+        if self._values is not None:
+            column = self._values[k]
+            column[pos + 1:size + 1] = column[pos:size]
+            column[pos] = value
+        self._sizes[k] = size = size + 1
+        if pos == size - 1:
+            self._maxes[k] = float(x)
+        self._offsets[k + 1:] += 1
+        self._len += 1
+
+        if size == len(chunk):
+            self._split(k)
+
+    def _split(self, k):
+        load = self._load
+        chunk = self._chunks[k]
+        right = np.empty(2 * load)
+        right[:load] = chunk[load:]
+        self._chunks.insert(k + 1, right)
+        if self._values is not None:
+            column = self._values[k]
+            right = np.empty_like(column)
+            right[:load] = column[load:]
+            self._values.insert(k + 1, right)
+        self._sizes[k] = load
+        self._sizes.insert(k + 1, load)
+        self._maxes.insert(k, float(chunk[load - 1]))
+        self._offsets = np.insert(self._offsets, k + 1,
+                                  self._offsets[k] + load)
+
+    def to_array(self):
+        """Return all elements as a sorted 1D array (a copy)."""
+        if not self._chunks:
+            return np.empty(0)
+        return np.concatenate([chunk[:size] for chunk, size
+                               in zip(self._chunks, self._sizes)])
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, list(self))
+
+
+class ArrayNeighbors(SortedArray):
+    """Compact replacement for the ``SortedDict`` of neighbors in `Learner1D`.
+
+    Behaves like the mapping ``{x_n: [x_{n-1}, x_{n+1}]}``, but the
+    neighbors of a point follow from the sorted order of the points,
+    such that only the points themselves are stored in a `SortedArray`.
+    Assigning ``neighbors[x] = value`` inserts ``x``, ``value`` is ignored
+    and the returned neighbor lists are copies.
+    """
+
+    def __getitem__(self, x):
+        if x not in self:
+            raise KeyError(x)
+        i = self.bisect_left(x)
+        return [self._key(i - 1), self._key(i + 1)]
+
+    def __setitem__(self, x, value):
+        self.add(x)
+
+    def _key(self, i):
+        if 0 <= i < self._len:
+            return SortedArray.__getitem__(self, i)
+        return None
+
+    def get(self, x, default=None):
+        if x in self:
+            return self[x]
+        return default
+
+    def keys(self):
+        return _KeysView(self)
+
+    def items(self):
+        xs = self.to_array().tolist()
+        lefts = itertools.chain([None], xs)
+        rights = itertools.chain(xs[1:], [None])
+        for x, x_left, x_right in zip(xs, lefts, rights):
+            yield x, [x_left, x_right]
+
+    def values(self):
+        for _, neighbors in self.items():
+            yield neighbors
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, dict(self.items()))
+
+
+class ColumnarData(SortedArray, MutableMapping):
+    """Mapping ``{x: y}`` from floats to fixed-shape values stored column-wise.
+
+    The points are kept in a `SortedArray` and the values in a parallel
+    ``float64`` array per chunk, such that a point costs
+    ``8 * (1 + vdim)`` bytes instead of a Python float and an array
+    object. The shape of the values is fixed by the first assignment.
+    Values are returned as copies, a float for scalar values
+    and an array otherwise.
+
+    Parameters
+    ----------
+    load : int, default: 1000
+        Half of the capacity of a chunk.
+    """
+
+    def __init__(self, load=1000):
+        super().__init__(load=load)
+
+    def __contains__(self, x):
+        # Like a dict, keys that cannot be compared to floats are absent.
+        if x is None:
+            return False
+        return super().__contains__(x)
+
+    def _find(self, x):
+        if x not in self:
+            raise KeyError(x)
+        return self._locate(x)
+
+    def __getitem__(self, x):
+        k, pos = self._find(x)
+        value = self._values[k][pos]
+        if value.ndim == 0:
+            return float(value)
+        return value.copy()
+
+    def __setitem__(self, x, y):
+        y = np.asarray(y, dtype=float)
+        if self._values is None:
+            self._value_shape = y.shape
+            self._values = []
+        elif y.shape != self._value_shape:
+            raise ValueError('Expected a value with shape {}, got {}.'
+                             .format(self._value_shape, y.shape))
+        if x in self:
+            k, pos = self._locate(x)
+            self._values[k][pos] = y
+        else:
+            self._insert(x, y)
+
+    def __delitem__(self, x):
+        self._find(x)
+        self.discard(x)
+
+    def arrays(self):
+        """Return the points and the values as contiguous arrays (copies).
+
+        Returns
+        -------
+        xs : 1D array
+            The sorted points.
+        ys : array
+            The values, ``ys[i]`` belongs to ``xs[i]``.
+        """
+        xs = self.to_array()
+        if self._values is None:
+            return xs, np.empty(0)
+        if not self._chunks:
+            return xs, np.empty((0,) + self._value_shape)
+        ys = np.concatenate([column[:size] for column, size
+                             in zip(self._values, self._sizes)])
+        return xs, ys
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, dict(self.items()))
+
+
+class _KeysView:
+    """Indexable view of the points of an `ArrayNeighbors`,
+    like ``SortedDict.keys()``."""
+
+    def __init__(self, neighbors):
+        self._neighbors = neighbors
+
+    def __len__(self):
+        return len(self._neighbors)
+
+    def __iter__(self):
+        return SortedArray.__iter__(self._neighbors)
+
+    def __getitem__(self, index):
+        return SortedArray.__getitem__(self._neighbors, index)
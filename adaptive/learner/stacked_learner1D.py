@@ -0,0 +1,508 @@
+# -*- coding: utf-8 -*-
+
+from collections import defaultdict
+from contextlib import suppress
+from functools import partial
+
+import numpy as np
+
+from adaptive.learner.balancing_learner import dispatch
+from adaptive.learner.base_learner import BaseLearner
+from adaptive.learner.learner1D import (linspace, vectorized_default_loss,
+                                        _water_filling)
+from adaptive.notebook_integration import ensure_holoviews
+from adaptive.utils import cache_latest, named_product, restore
+
+
+class StackedLearner1D(BaseLearner):
+    """Learns many functions 'f_k: ℝ → ℝ' on the same interval at once.
+
+    This does the same as a `~adaptive.BalancingLearner` of
+    `~adaptive.Learner1D`\s, but the points of all the functions are
+    stored in the rows of shared 2D arrays, and the losses of all the
+    functions are computed with a single call of the loss function.
+    This makes the learner suitable for large parameter sweeps.
+
+    Parameters
+    ----------
+    functions : sequence of callables
+        The functions to learn. Each must take a single real parameter
+        and return a real number.
+    bounds : pair of reals
+        The bounds of the interval on which to learn the functions.
+    loss_per_interval : callable, optional
+        A loss function that is marked with the
+        `~adaptive.learner.learner1D.vectorized_loss` decorator, see
+        `~adaptive.Learner1D`. By default
+        `~adaptive.learner.learner1D.vectorized_default_loss` is used.
+    cdims : sequence of dicts, or (keys, iterable of values), optional
+        Constant dimensions; the parameters that label the functions. Used
+        in `plot`. See `~adaptive.BalancingLearner`.
+
+    Attributes
+    ----------
+    function : callable
+        A function that calls the functions.
+        Its signature is ``function((index, x))``.
+    data : dict
+        Sampled points and values, the points are ``(index, x)``.
+        This is a copy.
+    pending_points : set
+        Points ``(index, x)`` that still have to be evaluated.
+        This is a copy.
+
+    Notes
+    -----
+    The losses of the functions to which points were added are recomputed
+    when they are needed. Unlike in `~adaptive.Learner1D` the losses are
+    always computed with the current y-scale of a function. The points
+    are chosen for all functions at once, as if the intervals of all the
+    functions belonged to a single `~adaptive.Learner1D`. Points outside
+    of the bounds are not allowed.
+    """
+
+    def __init__(self, functions, bounds, loss_per_interval=None, *,
+                 cdims=None):
+        self.functions = list(functions)
+        # See 'BalancingLearner.__init__' why this is not a method.
+        self.function = partial(dispatch, self.functions)
+
+        self.loss_per_interval = loss_per_interval or vectorized_default_loss
+        if not getattr(self.loss_per_interval, 'vectorized', False):
+            raise ValueError('The loss function must be decorated '
+                             'with "vectorized_loss".')
+        self.nth_neighbors = getattr(self.loss_per_interval,
+                                     'nth_neighbors', 0)
+
+        self.bounds = list(bounds)
+        self._cdims_default = cdims
+
+        # Row 'k' contains the sorted evaluated and pending points of
+        # function 'k', the values of pending points and the unused
+        # entries of the rows are NaN. Functions may also return NaN,
+        # so the pending points are marked in '_pending'.
+        n_functions = len(self.functions)
+        capacity = 8
+        self._xs = np.full((n_functions, capacity), np.nan)
+        self._ys = np.full((n_functions, capacity), np.nan)
+        self._pending = np.zeros((n_functions, capacity), dtype=bool)
+        self._sizes = np.zeros(n_functions, dtype=int)
+        self._y_min = np.full(n_functions, np.inf)
+        self._y_max = np.full(n_functions, -np.inf)
+
+        # The losses of the intervals between the points of every row,
+        # and the maximal loss of every row. Only the rows that are marked
+        # as "dirty" are updated, when the losses are needed.
+        self._losses = np.full((n_functions, capacity - 1), np.nan)
+        self._row_losses = np.full(n_functions, np.inf)
+        self._row_losses_combined = np.full(n_functions, np.inf)
+        self._dirty = np.zeros(n_functions, dtype=bool)
+
+        # The precision in 'x' below which we set losses to 0.
+        self._dx_eps = 2 * max(np.abs(bounds)) * np.finfo(float).eps
+
+    @classmethod
+    def from_product(cls, f, bounds, combos, loss_per_interval=None):
+        """Create a `StackedLearner1D` with functions of all combinations
+        of named variables’ values. The `cdims` will be set correctly.
+
+        Parameters
+        ----------
+        f : callable
+            Function to learn, must take arguments provided in in `combos`.
+        bounds : pair of reals
+            The bounds of the interval on which to learn the functions.
+        combos : dict (mapping individual fn arguments -> sequence of values)
+            For all combinations of each argument a function is learned.
+        loss_per_interval : callable, optional
+            A vectorized loss function.
+
+        Returns
+        -------
+        learner : `StackedLearner1D`
+
+        Example
+        -------
+        >>> def f(x, a, b):
+        ...     return np.tanh(a * (x - b))
+
+        >>> combos = {'a': [1, 10, 100], 'b': np.linspace(-0.5, 0.5, 11)}
+        >>> learner = StackedLearner1D.from_product(f, (-1, 1), combos)
+
+        Notes
+        -----
+        The order of the functions is the same as
+        ``adaptive.utils.named_product(**combos)``.
+        """
+        arguments = named_product(**combos)
+        functions = [partial(f, **combo) for combo in arguments]
+        return cls(functions, bounds, loss_per_interval, cdims=arguments)
+
+    @property
+    def data(self):
+        return {(k, x): y for k in range(len(self.functions))
+                for x, y in zip(*self._row_data(k))}
+
+    @property
+    def pending_points(self):
+        return {(int(k), float(self._xs[k, i]))
+                for k, i in zip(*np.nonzero(self._pending))}
+
+    @property
+    def npoints(self):
+        """Number of evaluated points."""
+        return int(self._sizes.sum() - np.count_nonzero(self._pending))
+
+    def _evaluated(self, rows, size):
+        """Mask of the evaluated points in the first 'size' columns."""
+        return (~self._pending[rows, :size]
+                & (np.arange(size) < self._sizes[rows, None]))
+
+    def _row_data(self, index):
+        """Return the evaluated points and values of function 'index'."""
+        xs = self._xs[index, :self._sizes[index]]
+        ys = self._ys[index, :self._sizes[index]]
+        evaluated = ~self._pending[index, :self._sizes[index]]
+        return xs[evaluated], ys[evaluated]
+
+    def _grow(self, capacity):
+        extra = capacity - self._xs.shape[1]
+        if extra <= 0:
+            return
+        padding = np.full((len(self.functions), extra), np.nan)
+        self._xs = np.hstack([self._xs, padding])
+        self._ys = np.hstack([self._ys, padding])
+        self._losses = np.hstack([self._losses, padding])
+        self._pending = np.hstack([self._pending,
+                                   np.zeros(padding.shape, dtype=bool)])
+
+    def _check_bounds(self, x):
+        if not self.bounds[0] <= x <= self.bounds[1]:
+            raise ValueError('{} is outside of the bounds {}.'
+                             .format(x, self.bounds))
+
+    def _insert(self, index, x, y, pending=False):
+        """Insert the point 'x' with value 'y' (NaN for a pending point)
+        into row 'index', return whether 'y' is stored."""
+        self._check_bounds(x)
+        size = self._sizes[index]
+        xs, ys = self._xs[index], self._ys[index]
+        i = np.searchsorted(xs[:size], x)
+        if i < size and xs[i] == x:
+            if not self._pending[index, i]:
+                return False
+            ys[i] = y
+            self._pending[index, i] = pending
+            self._dirty[index] = True
+            return True
+        if size == len(xs):
+            self._grow(2 * size)
+            xs, ys = self._xs[index], self._ys[index]
+        is_pending = self._pending[index]
+        xs[i + 1:size + 1] = xs[i:size]
+        ys[i + 1:size + 1] = ys[i:size]
+        is_pending[i + 1:size + 1] = is_pending[i:size]
+        xs[i], ys[i], is_pending[i] = x, y, pending
+        self._sizes[index] += 1
+        self._dirty[index] = True
+        return True
+
+    def _merge(self, index, xs, ys, pending=False):
+        """Insert the points 'xs' with values 'ys' (NaN for pending points)
+        into row 'index' at once."""
+        for x in xs:
+            self._check_bounds(x)
+        size = self._sizes[index]
+        xs = np.hstack([self._xs[index, :size], xs])
+        ys = np.hstack([self._ys[index, :size], ys])
+        pending = np.hstack([self._pending[index, :size],
+                             np.full(len(xs) - size, pending)])
+        # Sort on 'x' and put evaluated points first, such that
+        # those are kept when removing the duplicates.
+        order = np.lexsort((pending, xs))
+        xs, ys, pending = xs[order], ys[order], pending[order]
+        unique = np.hstack([True, np.diff(xs) != 0])
+        xs, ys, pending = xs[unique], ys[unique], pending[unique]
+
+        size = len(xs)
+        capacity = self._xs.shape[1]
+        if size > capacity:
+            self._grow(max(size, 2 * capacity))
+        self._xs[index, :size] = xs
+        self._ys[index, :size] = ys
+        self._pending[index, :size] = pending
+        self._sizes[index] = size
+        self._dirty[index] = True
+
+    def _update_y_range(self, index, ys):
+        ys = ys[~np.isnan(ys)]
+        if len(ys):
+            self._y_min[index] = min(self._y_min[index], ys.min())
+            self._y_max[index] = max(self._y_max[index], ys.max())
+
+    def tell(self, x, y):
+        index, x = x
+        y = float(y)
+        if self._insert(index, x, y):
+            self._update_y_range(index, np.array([y]))
+
+    def tell_many(self, xs, ys):
+        points_per_row = defaultdict(list)
+        for (index, x), y in zip(xs, ys):
+            points_per_row[index].append((x, float(y)))
+        for index, points in points_per_row.items():
+            xs, ys = np.array(points, dtype=float).T
+            self._merge(index, xs, ys)
+            self._update_y_range(index, ys)
+
+    def tell_pending(self, x):
+        index, x = x
+        self._insert(index, x, np.nan, pending=True)
+
+    def _tell_pending_many(self, xs):
+        points_per_row = defaultdict(list)
+        for index, x in xs:
+            points_per_row[index].append(x)
+        for index, xs in points_per_row.items():
+            self._merge(index, xs, np.full(len(xs), np.nan), pending=True)
+
+    def _update_losses(self):
+        """Recompute the losses of all the rows that changed at once."""
+        rows = np.flatnonzero(self._dirty)
+        if len(rows) == 0:
+            return
+        self._dirty[rows] = False
+
+        nn = self.nth_neighbors
+        size = self._sizes[rows].max()
+        m = max(size - 1, 0)  # The number of intervals in the longest row
+        xs = self._xs[rows, :size]
+        ys = self._ys[rows, :size]
+        evaluated = self._evaluated(rows, size)
+        n_evaluated = evaluated.sum(axis=1)
+
+        # Move the evaluated points to the front of every row, such that
+        # we can take the windows for the loss function.
+        order = np.argsort(~evaluated, axis=1, kind='mergesort')
+        real_xs = np.take_along_axis(xs, order, axis=1)
+        real_ys = np.take_along_axis(ys, order, axis=1)
+
+        # Gather every interval between evaluated points together with
+        # its 'nth_neighbors' neighboring intervals, missing points are NaN.
+        window = np.arange(m)[:, None] + np.arange(-nn, nn + 2)
+        missing = ((window < 0)
+                   | (window >= n_evaluated[:, None, None]))
+        window = np.clip(window, 0, max(size - 1, 0))
+        window_xs = real_xs[:, window]
+        window_ys = real_ys[:, window]
+
+        y_scale = self._y_max[rows] - self._y_min[rows]
+        y_scale[~(np.isfinite(y_scale) & (y_scale > 0))] = 1
+        xs_scaled = window_xs / (self.bounds[1] - self.bounds[0])
+        ys_scaled = window_ys / y_scale[:, None, None]
+        xs_scaled[missing] = np.nan
+        ys_scaled[missing] = np.nan
+
+        valid = np.arange(m) < (n_evaluated[:, None] - 1)
+        real_losses = np.full(valid.shape, np.nan)
+        if valid.any():
+            losses = np.asarray(self.loss_per_interval(xs_scaled[valid],
+                                                       ys_scaled[valid]),
+                                dtype=float)
+            dx = window_xs[valid][:, nn + 1] - window_xs[valid][:, nn]
+            losses[dx < self._dx_eps] = 0
+            # Nothing can be learned where the function returns NaN.
+            losses[np.isnan(losses)] = 0
+            real_losses[valid] = losses
+
+        # The intervals between all points get a part of the loss of the
+        # interval between evaluated points that contains them, in
+        # proportion to their length, like in 'Learner1D'. The intervals
+        # that are not inside such an interval have an infinite loss.
+        containing = np.cumsum(evaluated, axis=1)[:, :m] - 1
+        inside = (containing >= 0) & (containing < n_evaluated[:, None] - 1)
+        containing = np.clip(containing, 0, max(m - 1, 0))
+        losses = np.take_along_axis(real_losses, containing, axis=1)
+        real_dx = np.take_along_axis(np.diff(real_xs, axis=1),
+                                     containing, axis=1)
+        dx = np.diff(xs, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            losses = np.where(real_dx > 0, losses * dx / real_dx, 0)
+        losses = np.where(inside, losses, np.inf)
+        losses[np.arange(m) >= (self._sizes[rows, None] - 1)] = np.nan
+
+        self._losses[rows] = np.nan
+        self._losses[rows, :m] = losses
+        no_intervals = n_evaluated < 2
+        self._row_losses[rows] = np.where(
+            no_intervals, np.inf,
+            np.max(np.where(valid, real_losses, -np.inf),
+                   axis=1, initial=-np.inf))
+        self._row_losses_combined[rows] = np.where(
+            self._sizes[rows] < 2, np.inf,
+            np.max(np.where(np.isnan(losses), -np.inf, losses),
+                   axis=1, initial=-np.inf))
+
+    def losses(self, real=True):
+        """Return the loss of every function.
+
+        Parameters
+        ----------
+        real : bool, default: True
+            If False, return the "expected" losses, including
+            the pending points.
+
+        Returns
+        -------
+        losses : 1D array
+        """
+        self._update_losses()
+        losses = self._row_losses if real else self._row_losses_combined
+        return losses.copy()
+
+    @cache_latest
+    def loss(self, real=True):
+        return float(self.losses(real).max())
+
+    def ask(self, n, tell_pending=True):
+        """Choose the next 'n' points for all functions together."""
+        if not tell_pending:
+            with restore(self):
+                return self._ask_and_tell(n)
+        else:
+            return self._ask_and_tell(n)
+
+    def _ask_and_tell(self, n):
+        if n == 0:
+            return [], []
+
+        # If the bounds have not been chosen yet, we choose them first.
+        indices = np.arange(len(self.functions))
+        last = self._xs[indices, np.maximum(self._sizes - 1, 0)]
+        has_left = (self._sizes > 0) & (self._xs[:, 0] == self.bounds[0])
+        has_right = (self._sizes > 0) & (last == self.bounds[1])
+        points = []
+        for index in indices:
+            if not has_left[index]:
+                points.append((int(index), self.bounds[0]))
+            if not has_right[index] and self.bounds[1] != self.bounds[0]:
+                points.append((int(index), self.bounds[1]))
+        points = points[:n]
+        loss_improvements = [np.inf] * len(points)
+        self._tell_pending_many(points)
+
+        n_left = n - len(points)
+        if n_left > 0:
+            new_points, improvements = self._split_intervals(n_left)
+            self._tell_pending_many(new_points)
+            points += new_points
+            loss_improvements += improvements
+        return points, loss_improvements
+
+    def _split_intervals(self, n):
+        """Divide 'n' points over the intervals of all the functions."""
+        self._update_losses()
+        n_intervals = self._losses.shape[1]
+        rows, cols = np.nonzero(np.arange(n_intervals)
+                                < (self._sizes[:, None] - 1))
+        if len(rows) == 0:
+            return [], []
+        losses = self._losses[rows, cols]
+        x_left, x_right = self._xs[rows, cols], self._xs[rows, cols + 1]
+
+        # The same as 'finite_loss' but for all intervals at once.
+        widths = (x_right - x_left) / (self.bounds[1] - self.bounds[0])
+        finite_losses = np.where(np.isinf(losses), widths, losses)
+        finite_losses = np.floor(finite_losses * 1e12 + 0.5) / 1e12
+        if not finite_losses.max() > 0:
+            # All the functions are constant, divide the points evenly.
+            finite_losses = widths
+
+        n_points = _water_filling(finite_losses, n)
+        points = []
+        loss_improvements = []
+        for j in np.flatnonzero(n_points):
+            n_parts = int(n_points[j]) + 1
+            index = int(rows[j])
+            points.extend((index, x) for x in
+                          linspace(x_left[j], x_right[j], n_parts))
+            loss_improvements.extend([losses[j] / n_parts] * (n_parts - 1))
+        return points, loss_improvements
+
+    def remove_unfinished(self):
+        for index in range(len(self.functions)):
+            xs, ys = self._row_data(index)
+            self._xs[index] = self._ys[index] = np.nan
+            self._pending[index] = False
+            self._xs[index, :len(xs)] = xs
+            self._ys[index, :len(ys)] = ys
+            self._sizes[index] = len(xs)
+        self._dirty[:] = True
+
+    def plot(self, cdims=None, dynamic=True):
+        """Returns a DynamicMap with sliders.
+
+        Parameters
+        ----------
+        cdims : sequence of dicts, or (keys, iterable of values), optional
+            Constant dimensions; the parameters that label the functions.
+            See `~adaptive.BalancingLearner.plot`.
+        dynamic : bool, default True
+            Return a `holoviews.core.DynamicMap` if True, else a
+            `holoviews.core.HoloMap`.
+
+        Returns
+        -------
+        dm : `holoviews.core.DynamicMap` (default) or `holoviews.core.HoloMap`
+             A `DynamicMap` ``(dynamic=True)`` or `HoloMap`
+             ``(dynamic=False)`` with sliders that are defined by `cdims`.
+        """
+        hv = ensure_holoviews()
+        cdims = cdims or self._cdims_default
+
+        if cdims is None:
+            cdims = [{'i': i} for i in range(len(self.functions))]
+        elif not isinstance(cdims[0], dict):
+            # Normalize the format
+            keys, values_list = cdims
+            cdims = [dict(zip(keys, values)) for values in values_list]
+
+        mapping = {tuple(_cdims.values()): index
+                   for index, _cdims in enumerate(cdims)}
+
+        d = defaultdict(list)
+        for _cdims in cdims:
+            for k, v in _cdims.items():
+                d[k].append(v)
+
+        # Plot with 5% empty margins such that the boundary points are visible
+        margin = 0.05 * (self.bounds[1] - self.bounds[0])
+        plot_bounds = (self.bounds[0] - margin, self.bounds[1] + margin)
+
+        def plot_function(*args):
+            with suppress(KeyError):
+                xs, ys = self._row_data(mapping[tuple(args)])
+                p = hv.Scatter((xs, ys)) * hv.Path([])
+                return p.redim(x=dict(range=plot_bounds))
+
+        dm = hv.DynamicMap(plot_function, kdims=list(d.keys()))
+        dm = dm.redim.values(**d)
+
+        if dynamic:
+            return dm
+        else:
+            vals = {d.name: d.values for d in dm.dimensions() if d.values}
+            return hv.HoloMap(dm.select(**vals))
+
+    def _get_data(self):
+        # The same format as a 'BalancingLearner' of 'Learner1D's.
+        return [dict(zip(*self._row_data(index)))
+                for index in range(len(self.functions))]
+
+    def _set_data(self, data):
+        for index, _data in enumerate(data):
+            if _data:
+                xs, ys = zip(*_data.items())
+                self._merge(index, np.array(xs, dtype=float),
+                            np.array(ys, dtype=float))
+                self._update_y_range(index, np.array(ys, dtype=float))
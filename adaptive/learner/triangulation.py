@@ -1,5 +1,7 @@
-from collections import Counter, Sized, Iterable
-from itertools import combinations, chain
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Mapping, Sequence, Set, Sized
+from itertools import combinations, chain, compress
 
 import numpy as np
 import math
@@ -144,23 +146,39 @@ def circumsphere(pts):
     if dim == 3:
         return fast_3d_circumcircle(pts)
 
-    # Modified method from http://mathworld.wolfram.com/Circumsphere.html
-    mat = [[np.sum(np.square(pt)), *pt, 1] for pt in pts]
+    centers, radii = circumspheres([pts])
+    return tuple(centers[0]), radii[0]
 
-    center = []
-    for i in range(1, len(pts)):
-        r = np.delete(mat, i, 1)
-        factor = (-1) ** (i + 1)
-        center.append(factor * fast_det(r))
 
-    a = fast_det(np.delete(mat, 0, 1))
-    center = [x / (2 * a) for x in center]
+def circumspheres(simplices):
+    """Compute the centers and radii of the circumscribed spheres of
+    many simplices at once.
 
-    x0 = pts[0]
-    vec = np.subtract(center, x0)
-    radius = fast_norm(vec)
+    Parameters
+    ----------
+    simplices : 3D array-like of floats
+        The points of the simplices, with shape ``(n, dim + 1, dim)``.
 
-    return tuple(center), radius
+    Returns
+    -------
+    centers : 2D array of floats
+        The centers, with shape ``(n, dim)``.
+    radii : 1D array of floats
+        The radii. The centers and radii of flat simplices are NaN.
+    """
+    simplices = np.asarray(simplices, dtype=float)
+    x0 = simplices[:, 0]
+    vectors = simplices[:, 1:] - x0[:, None]
+    # the center c satisfies (x_i - x_0)·(c - x_0) = |x_i - x_0|² / 2
+    lengths = np.einsum('ijk,ijk->ij', vectors, vectors)[..., None] / 2
+    try:
+        offsets = np.linalg.solve(vectors, lengths)[..., 0]
+    except np.linalg.LinAlgError:
+        offsets = np.full_like(x0, np.nan)
+        regular = np.linalg.det(vectors) != 0
+        offsets[regular] = np.linalg.solve(vectors[regular],
+                                           lengths[regular])[..., 0]
+    return x0 + offsets, np.sqrt(np.einsum('ij,ij->i', offsets, offsets))
 
 
 def orientation(face, origin):
@@ -265,6 +283,9 @@ class Triangulation:
     vertex_to_simplices : list of sets
         Set of simplices connected to a vertex, the index of the vertex is the
         index of the list.
+    face_to_simplices : dict
+        Set of (at most two) simplices containing a (dim-1)-dimensional
+        face, the face is a sorted tuple of vertex indices.
     hull : set of int
         Exterior vertices
 
@@ -301,10 +322,7 @@ class Triangulation:
             raise ValueError("Initial simplex has zero volumes "
                              "(the points are linearly dependent)")
 
-        self.vertices = list(coords)
-        self.simplices = set()
-        # initialise empty set for each vertex
-        self.vertex_to_simplices = [set() for _ in coords]
+        self._init_storage(coords)
 
         # find a Delaunay triangulation to start with, then we will throw it
         # away and continue with our own algorithm
@@ -312,17 +330,71 @@ class Triangulation:
         for simplex in initial_tri.simplices:
             self.add_simplex(simplex)
 
+    @classmethod
+    def from_simplices(cls, vertices, simplices):
+        """Create a triangulation from its vertices and simplices,
+        for example the ones of another triangulation. It is not checked
+        whether the simplices form a valid triangulation.
+
+        Parameters
+        ----------
+        vertices : 2D array-like
+            The coordinates of the vertices.
+        simplices : 2D array-like of ints
+            The indices of the vertices of each simplex.
+        """
+        tri = cls.__new__(cls)
+        tri._init_storage(list(map(tuple, vertices)))
+        for simplex in simplices:
+            tri.add_simplex(simplex)
+        return tri
+
+    def _init_storage(self, coords):
+        self.vertices = list(coords)
+        self.simplices = set()
+        # initialise empty set for each vertex
+        self.vertex_to_simplices = [set() for _ in coords]
+        self.face_to_simplices = {}
+        self._hull_faces = set()
+        self._last_simplex = None
+        self._last_hull_face = None
+        self._circumspheres = {}  # simplex → (center, radius)
+        self._circumsphere_transform = None
+
     def delete_simplex(self, simplex):
         simplex = tuple(sorted(simplex))
         self.simplices.remove(simplex)
+        self._circumspheres.pop(simplex, None)
         for vertex in simplex:
             self.vertex_to_simplices[vertex].remove(simplex)
+        for face in combinations(simplex, len(simplex) - 1):
+            simplices = self.face_to_simplices[face]
+            simplices.remove(simplex)
+            if not simplices:
+                del self.face_to_simplices[face]
+                self._hull_faces.discard(face)
+            elif len(simplices) == 1:
+                self._hull_faces.add(face)
 
     def add_simplex(self, simplex):
         simplex = tuple(sorted(simplex))
         self.simplices.add(simplex)
         for vertex in simplex:
             self.vertex_to_simplices[vertex].add(simplex)
+        for face in combinations(simplex, len(simplex) - 1):
+            simplices = self.face_to_simplices.setdefault(face, set())
+            simplices.add(simplex)
+            if len(simplices) == 1:
+                self._hull_faces.add(face)
+            else:
+                self._hull_faces.discard(face)
+
+    def neighbours(self, simplex):
+        """Simplices sharing a (dim-1)-dimensional face with a simplex."""
+        face_to_simplices = self.face_to_simplices
+        return set(other for face in combinations(simplex, len(simplex) - 1)
+                   for other in face_to_simplices.get(face, ())
+                   if other != simplex)
 
     def get_vertices(self, indices):
         return [self.vertices[i] for i in indices]
@@ -356,17 +428,95 @@ class Triangulation:
         vertices = self.get_vertices(simplex)
         return point_in_simplex(point, vertices, eps)
 
-    def locate_point(self, point):
+    def locate_point(self, point, start=None):
         """Find to which simplex the point belongs.
 
         Return indices of the simplex containing the point.
         Empty tuple means the point is outside the triangulation
+
+        The simplex is found by walking through neighbouring simplices,
+        starting from ``start``, the last located simplex, or a simplex
+        near the point. Only if the walk fails, all simplices are checked.
         """
+        point = tuple(point)
+        if not self.simplices:
+            return ()
+        simplex = self._walk(point, self._walk_start(point, start))
+        if simplex is not None:
+            return simplex
         for simplex in self.simplices:
             if self.point_in_simplex(point, simplex):
                 return simplex
         return ()
 
+    def _walk_start(self, point, start=None):
+        if start is not None and tuple(start) in self.simplices:
+            return tuple(start)
+        # Jump: sample ~N^(1/3) vertices and start from the one
+        # closest to the point.
+        n = len(self.vertices)
+        candidates = np.linspace(0, n - 1, int(n ** (1 / 3)) + 1, dtype=int)
+        candidates = [i for i in candidates if self.vertex_to_simplices[i]]
+        if self._last_simplex in self.simplices:
+            candidates.extend(self._last_simplex)
+        if not candidates:
+            return next(iter(self.simplices))
+        distances = np.subtract(self.get_vertices(candidates), point)
+        closest = candidates[np.argmin(np.einsum('ij,ij->i',
+                                                 distances, distances))]
+        return next(iter(self.vertex_to_simplices[closest]))
+
+    def _barycentric_coordinates(self, point, simplex):
+        if self.dim == 2:
+            (x0, y0), (x1, y1), (x2, y2) = self.get_vertices(simplex)
+            px, py = point
+            det = (y1 - y2) * (x0 - x2) + (x2 - x1) * (y0 - y2)
+            if det == 0:
+                return None
+            l0 = ((y1 - y2) * (px - x2) + (x2 - x1) * (py - y2)) / det
+            l1 = ((y2 - y0) * (px - x2) + (x0 - x2) * (py - y2)) / det
+            return (l0, l1, 1 - l0 - l1)
+
+        x0 = np.array(self.vertices[simplex[0]], dtype=float)
+        vectors = np.array(self.get_vertices(simplex[1:]), dtype=float) - x0
+        try:
+            alpha = np.linalg.solve(vectors.T, np.subtract(point, x0))
+        except np.linalg.LinAlgError:
+            return None
+        return (1 - alpha.sum(), *alpha)
+
+    def _walk(self, point, simplex, eps=1e-8):
+        """Visibility walk from ``simplex`` towards ``point``.
+
+        Returns the simplex containing the point, an empty tuple if the
+        point lies outside the hull, or None if the walk failed.
+        """
+        visited = set()
+        while True:
+            visited.add(simplex)
+            alpha = self._barycentric_coordinates(point, simplex)
+            if alpha is None:
+                return None
+            outside = sorted((a, i) for i, a in enumerate(alpha) if a < -eps)
+            if not outside:
+                self._last_simplex = simplex
+                return simplex
+            # cross the face opposite to the most negative coordinate
+            # that has a neighbouring simplex
+            for _, i in outside:
+                face = simplex[:i] + simplex[i + 1:]
+                neighbours = self.face_to_simplices[face] - {simplex}
+                if neighbours:
+                    break
+            else:
+                # the point lies beyond the hull faces of this simplex
+                i = outside[0][1]
+                self._last_hull_face = simplex[:i] + simplex[i + 1:]
+                return ()
+            simplex = neighbours.pop()
+            if simplex in visited:
+                return None
+
     @property
     def dim(self):
         return len(self.vertices[0])
@@ -397,40 +547,71 @@ class Triangulation:
         """Simplices containing a face."""
         return set.intersection(*(self.vertex_to_simplices[i] for i in face))
 
-    def _extend_hull(self, new_vertex, eps=1e-8):
-        # count multiplicities in order to get all hull faces
-        multiplicities = Counter(face for face in self.faces())
-        hull_faces = [face for face, count in multiplicities.items() if count == 1]
+    def _hull_face_is_visible(self, face, point):
+        """Whether ``point`` lies on the outer side of a hull face."""
+        # the remaining vertex of the simplex lies on the inner side
+        simplex, = self.face_to_simplices[face]
+        inside, = (i for i in simplex if i not in face)
+        pts_face = tuple(self.get_vertices(face))
+        orientation_inside = orientation(pts_face, self.vertices[inside])
+        orientation_point = orientation(pts_face, point)
+        return orientation_inside == -orientation_point
+
+    def _neighbouring_hull_faces(self, face):
+        """Hull faces sharing a (dim-2)-dimensional ridge with a hull face."""
+        neighbours = set()
+        for ridge in combinations(face, len(face) - 1):
+            for simplex in self.containing(ridge):
+                for other in combinations(simplex, self.dim):
+                    if (other != face and other in self._hull_faces
+                            and all(i in other for i in ridge)):
+                        neighbours.add(other)
+        return neighbours
+
+    def _visible_hull_faces(self, point):
+        """Hull faces that are visible from a point outside of the hull.
+
+        Starting from the hull face through which `locate_point` left the
+        triangulation, only the visible faces and their neighbours are
+        checked, because the visible part of a convex hull is connected.
+        """
+        start = self._last_hull_face
+        self._last_hull_face = None
+        if start in self._hull_faces and self._hull_face_is_visible(start,
+                                                                    point):
+            queue = [start]
+        else:
+            queue = [face for face in self._hull_faces
+                     if self._hull_face_is_visible(face, point)]
+
+        visible = set(queue)
+        checked = set(queue)
+        while queue:
+            face = queue.pop()
+            for other in self._neighbouring_hull_faces(face) - checked:
+                checked.add(other)
+                if self._hull_face_is_visible(other, point):
+                    visible.add(other)
+                    queue.append(other)
+        return visible
 
-        # compute the center of the convex hull, this center lies in the hull
-        # we do not really need the center, we only need a point that is
-        # guaranteed to lie strictly within the hull
-        hull_points = self.get_vertices(self.hull)
-        pt_center = np.average(hull_points, axis=0)
+    def _extend_hull(self, new_vertex, eps=1e-8):
+        visible_faces = self._visible_hull_faces(new_vertex)
 
         pt_index = len(self.vertices)
         self.vertices.append(new_vertex)
 
         new_simplices = set()
-        for face in hull_faces:
-            # do orientation check, if orientation is the same, it lies on
-            # the same side of the face, otherwise, it lies on the other
-            # side of the face
-            pts_face = tuple(self.get_vertices(face))
-            orientation_inside = orientation(pts_face, pt_center)
-            orientation_new_point = orientation(pts_face, new_vertex)
-            if orientation_inside == -orientation_new_point:
-                # if the orientation of the new vertex is zero or directed
-                # towards the center, do not add the simplex
-                simplex = (*face, pt_index)
-                if not self._simplex_is_almost_flat(simplex):
-                    self.add_simplex(simplex)
-                    new_simplices.add(simplex)
+        for face in visible_faces:
+            simplex = (*face, pt_index)
+            if not self._simplex_is_almost_flat(simplex):
+                self.add_simplex(simplex)
+                new_simplices.add(simplex)
 
         if len(new_simplices) == 0:
             # We tried to add an internal point, revert and raise.
-            for tri in self.vertex_to_simplices[pt_index]:
-                self.simplices.remove(tri)
+            for tri in list(self.vertex_to_simplices[pt_index]):
+                self.delete_simplex(tri)
             del self.vertex_to_simplices[pt_index]
             del self.vertices[pt_index]
             raise ValueError("Candidate vertex is inside the hull.")
@@ -454,13 +635,43 @@ class Triangulation:
         return circumsphere(pts)
 
     def point_in_cicumcircle(self, pt_index, simplex, transform):
-        # return self.fast_point_in_circumcircle(pt_index, simplex, transform)
+        return self.point_in_circumspheres(pt_index, [simplex], transform)[0]
+
+    def point_in_circumspheres(self, pt_index, simplices, transform):
+        """Check for several simplices whether a vertex lies inside their
+        circumscribed spheres, after applying ``transform``.
+
+        Returns
+        -------
+        inside : 1D array of bools
+        """
         eps = 1e-8
 
-        center, radius = self.circumscribed_circle(simplex, transform)
-        pt = np.dot(self.get_vertices([pt_index]), transform)[0]
+        centers, radii = self._get_circumspheres(simplices, transform)
+        pt = np.dot(self.vertices[pt_index], transform)
+
+        return np.linalg.norm(centers - pt, axis=1) < (radii * (1 + eps))
 
-        return np.linalg.norm(center - pt) < (radius * (1 + eps))
+    def _get_circumspheres(self, simplices, transform):
+        """Circumscribed spheres of the simplices, computed only for the
+        simplices that have not been seen with this transform before."""
+        self._set_circumsphere_transform(transform)
+        cache = self._circumspheres
+        missing = [simplex for simplex in simplices if simplex not in cache]
+        if missing:
+            pts = np.dot([self.get_vertices(s) for s in missing], transform)
+            centers, radii = circumspheres(pts)
+            cache.update(zip(missing, zip(centers, radii)))
+        centers, radii = zip(*(cache[simplex] for simplex in simplices))
+        return np.array(centers), np.array(radii)
+
+    def _set_circumsphere_transform(self, transform):
+        if not np.array_equal(transform, self._circumsphere_transform):
+            self._clear_circumspheres()
+            self._circumsphere_transform = np.array(transform)
+
+    def _clear_circumspheres(self):
+        self._circumspheres.clear()
 
     @property
     def default_transform(self):
@@ -497,25 +708,19 @@ class Triangulation:
         bad_triangles = set()
 
         while len(queue):
-            simplex = queue.pop()
-            done_simplices.add(simplex)
-
-            if self.point_in_cicumcircle(pt_index, simplex, transform):
+            # check all simplices of the queue at once
+            simplices = list(queue)
+            queue = set()
+            done_simplices.update(simplices)
+            inside = self.point_in_circumspheres(pt_index, simplices,
+                                                 transform)
+
+            for simplex in compress(simplices, inside):
+                # Get all simplices sharing a face with the simplex,
+                # except for the already evaluated simplices
+                neighbours = self.neighbours(simplex) - done_simplices
                 self.delete_simplex(simplex)
-                todo_points = set(simplex)
                 bad_triangles.add(simplex)
-
-                # Get all simplices that share at least a point with the simplex
-                neighbours = set.union(*[self.vertex_to_simplices[p]
-                                         for p in todo_points])
-                # Filter out the already evaluated simplices
-                neighbours = neighbours - done_simplices
-
-                # Keep only the simplices sharing a whole face with the current simplex
-                neighbours = set(
-                    simpl for simpl in neighbours
-                    if len(set(simpl) & set(simplex)) == self.dim  # they share a face
-                )
                 queue.update(neighbours)
 
         faces = list(self.faces(simplices=bad_triangles))
@@ -523,11 +728,13 @@ class Triangulation:
         multiplicities = Counter(face for face in faces)
         hole_faces = [face for face in faces if multiplicities[face] < 2]
 
-        for face in hole_faces:
-            if pt_index not in face:
-                simplex = (*face, pt_index)
-                if not self._simplex_is_almost_flat(simplex):
-                    self.add_simplex(simplex)
+        new_simplices = [(*face, pt_index) for face in hole_faces
+                         if pt_index not in face]
+        if new_simplices:
+            # check the flatness of all new simplices at once
+            flat = self._relative_volumes(new_simplices) < 1e-8
+            for simplex in compress(new_simplices, ~flat):
+                self.add_simplex(simplex)
 
         new_triangles = self.vertex_to_simplices[pt_index]
         return bad_triangles - new_triangles, new_triangles - bad_triangles
@@ -546,6 +753,15 @@ class Triangulation:
         average_edge_length = np.mean(np.abs(vectors))
         return self.volume(simplex) / (average_edge_length ** self.dim)
 
+    def _relative_volumes(self, simplices):
+        """Like `_relative_volume`, but for several simplices at once."""
+        vertices = np.array([self.get_vertices(s) for s in simplices],
+                            dtype=float)
+        vectors = vertices[:, 1:] - vertices[:, :1]
+        average_edge_lengths = np.abs(vectors).mean(axis=(1, 2))
+        volumes = np.abs(np.linalg.det(vectors)) / factorial(self.dim)
+        return volumes / average_edge_lengths ** self.dim
+
     def add_point(self, point, simplex=None, transform=None):
         """Add a new vertex and create simplices as appropriate.
 
@@ -558,8 +774,7 @@ class Triangulation:
             simplices) when running the Bowyer Watson method.
         simplex : tuple of ints, optional
             Simplex containing the point. Empty tuple indicates points outside
-            the hull. If not provided, the algorithm costs O(N), so this should
-            be used whenever possible.
+            the hull. If not provided, it is found with `locate_point`.
         """
         point = tuple(point)
         if simplex is None:
@@ -592,7 +807,11 @@ class Triangulation:
         else:
             pt_index = len(self.vertices)
             self.vertices.append(point)
-            return self.bowyer_watson(pt_index, actual_simplex, transform)
+            deleted, added = self.bowyer_watson(pt_index, actual_simplex,
+                                                transform)
+            # the next point is likely close to this one
+            self._last_simplex = next(iter(added), None)
+            return deleted, added
 
     def volume(self, simplex):
         prefactor = np.math.factorial(self.dim)
@@ -604,15 +823,24 @@ class Triangulation:
         return [self.volume(sim) for sim in self.simplices]
 
     def reference_invariant(self):
-        """vertex_to_simplices and simplices are compatible."""
+        """vertex_to_simplices, face_to_simplices and simplices are
+        compatible."""
         for vertex in range(len(self.vertices)):
             if any(vertex not in tri
                    for tri in self.vertex_to_simplices[vertex]):
                 return False
+        for face, simplices in self.face_to_simplices.items():
+            if not 0 < len(simplices) <= 2:
+                return False
+            if any(not set(face) < set(tri) for tri in simplices):
+                return False
         for simplex in self.simplices:
             if any(simplex not in self.vertex_to_simplices[pt]
                    for pt in simplex):
                 return False
+            if any(simplex not in self.face_to_simplices.get(face, ())
+                   for face in combinations(simplex, self.dim)):
+                return False
         return True
 
     def vertex_invariant(self, vertex):
@@ -621,28 +849,247 @@ class Triangulation:
 
     @property
     def hull(self):
-        """Compute hull from triangulation.
-
-        Parameters
-        ----------
-        check : bool, default: True
-            Whether to raise an error if the computed hull is different from
-            stored.
+        """Exterior vertices of the triangulation.
 
         Returns
         -------
         hull : set of int
             Vertices in the hull.
         """
-        counts = Counter(self.faces())
-        if any(i > 2 for i in counts.values()):
-            raise RuntimeError("Broken triangulation, a (N-1)-dimensional"
-                               " appears in more than 2 simplices.")
-
-        hull = set(point for face, count in counts.items() if count == 1
-                   for point in face)
-        return hull
+        return set(chain.from_iterable(self._hull_faces))
 
     def convex_invariant(self, vertex):
         """Hull is convex."""
         raise NotImplementedError
+
+
+def _simplex_key(simplex):
+    """Pack the (sorted) vertex indices of a simplex into a single int."""
+    key = 1  # such that keys of faces and simplices differ
+    for i in simplex:
+        key = key << 32 | int(i)
+    return key
+
+
+class _VertexArray(Sequence):
+    """List of vertex tuples backed by a growing float64 array."""
+
+    def __init__(self, coords):
+        self._data = np.array(coords, dtype=float)
+        self._n = len(self._data)
+
+    @property
+    def array(self):
+        return self._data[:self._n]
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [tuple(v) for v in self.array[index].tolist()]
+        return tuple(self._data[range(self._n)[index]].tolist())
+
+    def __iter__(self):
+        return map(tuple, self.array.tolist())
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def append(self, vertex):
+        if self._n == len(self._data):
+            data = np.empty((2 * self._n, self._data.shape[1]))
+            data[:self._n] = self._data
+            self._data = data
+        self._data[self._n] = vertex
+        self._n += 1
+
+    def __delitem__(self, index):
+        if range(self._n)[index] != self._n - 1:
+            raise IndexError("Only the last vertex can be deleted.")
+        self._n -= 1
+
+
+class _SimplexSet(Set):
+    """Set of the simplices of a `CompactTriangulation`."""
+
+    def __init__(self, tri):
+        self._tri = tri
+
+    def __contains__(self, simplex):
+        try:
+            return _simplex_key(simplex) in self._tri._slots
+        except TypeError:
+            return False
+
+    def __len__(self):
+        return len(self._tri._slots)
+
+    def __iter__(self):
+        rows = self._tri._simplex_array[:self._tri._n_slots]
+        return map(tuple, rows[rows[:, 0] >= 0].tolist())
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return set(iterable)
+
+    def copy(self):
+        return set(self)
+
+
+class _VertexToSimplices(Sequence):
+    """Simplices containing each vertex of a `CompactTriangulation`."""
+
+    def __init__(self, tri):
+        self._tri = tri
+
+    def __len__(self):
+        return len(self._tri._incidence)
+
+    def __getitem__(self, vertex):
+        return self._tri._simplices_at(self._tri._incidence[vertex])
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def append(self, simplices):
+        if simplices:
+            raise ValueError("Can only append a vertex without simplices.")
+        self._tri._incidence.append(array('i'))
+
+    def pop(self):
+        if self._tri._incidence[-1]:
+            raise ValueError("Can only remove a vertex without simplices.")
+        self._tri._incidence.pop()
+        return set()
+
+    def __delitem__(self, vertex):
+        if range(len(self))[vertex] != len(self) - 1:
+            raise IndexError("Only the last vertex can be deleted.")
+        self.pop()
+
+
+class _FaceToSimplices(Mapping):
+    """Simplices containing each face of a `CompactTriangulation`."""
+
+    def __init__(self, tri):
+        self._tri = tri
+
+    def __getitem__(self, face):
+        if len(face) != self._tri.dim or list(face) != sorted(face):
+            raise KeyError(face)
+        simplices = self._tri.containing(face)
+        if not simplices:
+            raise KeyError(face)
+        return simplices
+
+    def __iter__(self):
+        dim = self._tri.dim
+        return iter({face for simplex in self._tri.simplices
+                     for face in combinations(simplex, dim)})
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class CompactTriangulation(Triangulation):
+    """A triangulation that stores its vertices and simplices in arrays.
+
+    The vertices are stored in a float64 array, the simplices in an int32
+    array in which the rows of deleted simplices are reused, and every
+    vertex keeps an int32 array with the rows of its simplices. This uses
+    several times less memory than `Triangulation`, at the cost of slower
+    point insertion.
+
+    The attributes ``vertices``, ``simplices``, ``vertex_to_simplices`` and
+    ``face_to_simplices`` are views that behave like the lists, sets and
+    dicts of `Triangulation`, but they cannot be modified directly.
+    """
+
+    def _init_storage(self, coords):
+        self.vertices = _VertexArray(coords)
+        dim = self.vertices.array.shape[1]
+        self._simplex_array = np.empty((len(coords), dim + 1), dtype=np.int32)
+        # circumscribed spheres, a negative radius means not computed
+        self._centers = np.empty((len(coords), dim))
+        self._radii = np.empty(len(coords))
+        self._circumsphere_transform = None
+        self._n_slots = 0
+        self._free_slots = []
+        self._slots = {}  # simplex key → row in _simplex_array
+        self._incidence = [array('i') for _ in coords]
+        self.simplices = _SimplexSet(self)
+        self.vertex_to_simplices = _VertexToSimplices(self)
+        self.face_to_simplices = _FaceToSimplices(self)
+        self._hull_faces = set()
+        self._last_simplex = None
+        self._last_hull_face = None
+
+    def _simplices_at(self, slots):
+        rows = self._simplex_array[np.asarray(slots, dtype=np.int32)]
+        return set(map(tuple, rows.tolist()))
+
+    def _containing_slots(self, face):
+        slots = set(self._incidence[face[0]])
+        for i in face[1:]:
+            slots.intersection_update(self._incidence[i])
+        return slots
+
+    def _update_hull_faces(self, simplex):
+        for face in combinations(simplex, len(simplex) - 1):
+            if len(self._containing_slots(face)) == 1:
+                self._hull_faces.add(face)
+            else:
+                self._hull_faces.discard(face)
+
+    def add_simplex(self, simplex):
+        simplex = tuple(sorted(map(int, simplex)))
+        key = _simplex_key(simplex)
+        if key in self._slots:
+            return
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = self._n_slots
+            self._n_slots += 1
+            if slot == len(self._simplex_array):
+                self._simplex_array, self._centers, self._radii = (
+                    np.concatenate([a, np.empty_like(a)]) for a in
+                    (self._simplex_array, self._centers, self._radii))
+        self._simplex_array[slot] = simplex
+        self._radii[slot] = -1
+        self._slots[key] = slot
+        for vertex in simplex:
+            self._incidence[vertex].append(slot)
+        self._update_hull_faces(simplex)
+
+    def delete_simplex(self, simplex):
+        simplex = tuple(sorted(map(int, simplex)))
+        slot = self._slots.pop(_simplex_key(simplex))
+        self._simplex_array[slot] = -1
+        self._free_slots.append(slot)
+        for vertex in simplex:
+            self._incidence[vertex].remove(slot)
+        self._update_hull_faces(simplex)
+
+    def _get_circumspheres(self, simplices, transform):
+        self._set_circumsphere_transform(transform)
+        slots = np.array([self._slots[_simplex_key(s)] for s in simplices])
+        missing = slots[self._radii[slots] < 0]
+        if len(missing):
+            pts = self.vertices.array[self._simplex_array[missing]]
+            self._centers[missing], self._radii[missing] = circumspheres(
+                np.dot(pts, transform))
+        return self._centers[slots], self._radii[slots]
+
+    def _clear_circumspheres(self):
+        self._radii[:] = -1
+
+    def get_vertices(self, indices):
+        return [tuple(v) for v in
+                self.vertices.array[np.asarray(list(indices), dtype=int)]
+                .tolist()]
+
+    def containing(self, face):
+        """Simplices containing a face."""
+        return self._simplices_at(list(self._containing_slots(face)))
@@ -11,6 +11,8 @@ import time
 import traceback
 import warnings
 
+import numpy as np
+
 from adaptive.notebook_integration import live_plot, live_info, in_ipynb
 
 try:
@@ -102,6 +104,14 @@ class BaseRunner(metaclass=abc.ABCMeta):
     pending_points : dict
         A mapping of `~concurrent.futures.Future`\s to points.
 
+    Notes
+    -----
+    If the learner has ``learner.vectorized_function == True`` (see
+    `~adaptive.Learner1D`), every task evaluates a batch of
+    ``learner.batch_size`` points with a single call of the function.
+    The "points" in `to_retry`, `tracebacks` and `pending_points`
+    are then tuples with the points of a batch.
+
     Methods
     -------
     overhead : callable
@@ -128,6 +138,7 @@ class BaseRunner(metaclass=abc.ABCMeta):
 
         self.learner = learner
         self.log = [] if log else None
+        self._vectorized = getattr(learner, 'vectorized_function', False)
 
         # Timing
         self.start_time = time.time()
@@ -165,6 +176,20 @@ class BaseRunner(metaclass=abc.ABCMeta):
             loss_improvements += l
         return points, loss_improvements
 
+    def _ask_batches(self, n):
+        """Return 'n' batches of points, the batches that should
+        be retried first."""
+        batches = [b for b in self.to_retry.keys()
+                   if b not in self.pending_points.values()][:n]
+        for _ in range(n - len(batches)):
+            if self.do_log:
+                self.log.append(('ask', self.learner.batch_size))
+            points, _ = self.learner.ask(self.learner.batch_size)
+            if not points:
+                break
+            batches.append(tuple(points))
+        return batches
+
     def overhead(self):
         """Overhead of using Adaptive and the executor in percent.
 
@@ -205,9 +230,14 @@ class BaseRunner(metaclass=abc.ABCMeta):
                 self._elapsed_function_time += t / self._get_max_tasks()
                 self.to_retry.pop(x, None)
                 self.tracebacks.pop(x, None)
-                if self.do_log:
-                    self.log.append(('tell', x, y))
-                self.learner.tell(x, y)
+                if self._vectorized:
+                    if self.do_log:
+                        self.log.append(('tell_many', x, y))
+                    self.learner.tell_many(x, y)
+                else:
+                    if self.do_log:
+                        self.log.append(('tell', x, y))
+                    self.learner.tell(x, y)
 
     def _get_futures(self):
         # Launch tasks to replace the ones that completed
@@ -215,14 +245,16 @@ class BaseRunner(metaclass=abc.ABCMeta):
         # that have started since the last iteration.
         n_new_tasks = max(0, self._get_max_tasks() - len(self.pending_points))
 
-        if self.do_log:
-            self.log.append(('ask', n_new_tasks))
-
-        points, _ = self._ask(n_new_tasks)
+        if self._vectorized:
+            points = self._ask_batches(n_new_tasks)
+        else:
+            if self.do_log:
+                self.log.append(('ask', n_new_tasks))
+            points, _ = self._ask(n_new_tasks)
 
         for x in points:
             start_time = time.time()  # so we can measure execution time
-            fut = self._submit(x)
+            fut = self._submit(np.array(x) if self._vectorized else x)
             fut.start_time = start_time
             self.pending_points[fut] = x
 
@@ -610,6 +642,9 @@ def simple(learner, goal):
     as the learner's function is evaluated in the same thread,
     meaning that exceptions can simple be caught an inspected.
 
+    If the learner has ``learner.vectorized_function == True``, a batch
+    of points is evaluated at once with ``learner.evaluate_batch()``.
+
     Parameters
     ----------
     learner : ~`adaptive.BaseLearner` instance
@@ -617,6 +652,11 @@ def simple(learner, goal):
         The end condition for the calculation. This function must take the
         learner as its sole argument, and return True if we should stop.
     """
+    if getattr(learner, 'vectorized_function', False):
+        while not goal(learner):
+            learner.evaluate_batch()
+        return
+
     while not goal(learner):
         xs, _ = learner.ask(1)
         for x in xs:
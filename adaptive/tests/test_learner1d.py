@@ -1,16 +1,21 @@
 # -*- coding: utf-8 -*-
 
 import random
+
 import numpy as np
+import pytest
 
 from adaptive.learner import Learner1D
+from adaptive.learner import learner1D
 from adaptive.learner.learner1D import curvature_loss_function
+from adaptive.learner.sorted_array import ArrayNeighbors, ColumnarData
 from adaptive.runner import simple
 
 
-def test_pending_loss_intervals():
+@pytest.mark.parametrize('compact_neighbors', [False, True])
+def test_pending_loss_intervals(compact_neighbors):
     # https://github.com/python-adaptive/adaptive/issues/40
-    l = Learner1D(lambda x: x, (0, 4))
+    l = Learner1D(lambda x: x, (0, 4), compact_neighbors=compact_neighbors)
 
     l.tell(0, 0)
     l.tell(1, 0)
@@ -23,9 +28,10 @@ def test_pending_loss_intervals():
         (0, 1), (1, 2), (2, 3.5), (3.5, 4.0)}
 
 
-def test_loss_interpolation_for_unasked_point():
+@pytest.mark.parametrize('compact_neighbors', [False, True])
+def test_loss_interpolation_for_unasked_point(compact_neighbors):
     # https://github.com/python-adaptive/adaptive/issues/40
-    l = Learner1D(lambda x: x, (0, 4))
+    l = Learner1D(lambda x: x, (0, 4), compact_neighbors=compact_neighbors)
 
     l.tell(0, 0)
     l.tell(1, 0)
@@ -47,42 +53,51 @@ def test_loss_interpolation_for_unasked_point():
         (0, 1): 0.25, (1, 2): 0.25, (2, 3): 0.25, (3, 4): 0.25}
 
 
-def test_first_iteration():
+@pytest.mark.parametrize('compact_neighbors', [False, True])
+def test_first_iteration(compact_neighbors):
     """Edge cases where we ask for a few points at the start."""
-    learner = Learner1D(lambda x: None, (-1, 1))
+    learner = Learner1D(lambda x: None, (-1, 1),
+                        compact_neighbors=compact_neighbors)
     points, loss_improvements = learner.ask(2)
     assert set(points) == set(learner.bounds)
 
-    learner = Learner1D(lambda x: None, (-1, 1))
+    learner = Learner1D(lambda x: None, (-1, 1),
+                        compact_neighbors=compact_neighbors)
     points, loss_improvements = learner.ask(3)
     assert set(points) == set([-1, 0, 1])
 
-    learner = Learner1D(lambda x: None, (-1, 1))
+    learner = Learner1D(lambda x: None, (-1, 1),
+                        compact_neighbors=compact_neighbors)
     points, loss_improvements = learner.ask(1)
     assert len(points) == 1 and points[0] in learner.bounds
     rest = set([-1, 0, 1]) - set(points)
     points, loss_improvements = learner.ask(2)
     assert set(points) == set(rest)
 
-    learner = Learner1D(lambda x: None, (-1, 1))
+    learner = Learner1D(lambda x: None, (-1, 1),
+                        compact_neighbors=compact_neighbors)
     points, loss_improvements = learner.ask(1)
     to_see = set(learner.bounds) - set(points)
     points, loss_improvements = learner.ask(1)
     assert set(points) == set(to_see)
 
-    learner = Learner1D(lambda x: None, (-1, 1))
+    learner = Learner1D(lambda x: None, (-1, 1),
+                        compact_neighbors=compact_neighbors)
     learner.tell(1, 0)
     points, loss_improvements = learner.ask(1)
     assert points == [-1]
 
-    learner = Learner1D(lambda x: None, (-1, 1))
+    learner = Learner1D(lambda x: None, (-1, 1),
+                        compact_neighbors=compact_neighbors)
     learner.tell(-1, 0)
     points, loss_improvements = learner.ask(1)
     assert points == [1]
 
 
-def test_loss_interpolation():
-    learner = Learner1D(lambda _: 0, bounds=(-1, 1))
+@pytest.mark.parametrize('compact_neighbors', [False, True])
+def test_loss_interpolation(compact_neighbors):
+    learner = Learner1D(lambda _: 0, bounds=(-1, 1),
+                        compact_neighbors=compact_neighbors)
 
     learner.tell(-1, 0)
     learner.tell(1, 0)
@@ -126,9 +141,10 @@ def test_termination_on_discontinuities():
     assert smallest_interval >= 0.5e3 * np.finfo(float).eps
 
 
-def test_order_adding_points():
+@pytest.mark.parametrize('compact_neighbors', [False, True])
+def test_order_adding_points(compact_neighbors):
     # and https://github.com/python-adaptive/adaptive/issues/41
-    l = Learner1D(lambda x: x, (0, 1))
+    l = Learner1D(lambda x: x, (0, 1), compact_neighbors=compact_neighbors)
     l.tell_many([1, 0, 0.5], [0, 0, 0])
     assert l.losses_combined == {(0, 0.5): 0.5, (0.5, 1): 0.5}
     assert l.losses == {(0, 0.5): 0.5, (0.5, 1): 0.5}
@@ -164,13 +180,15 @@ def small_deviations(x):
     return 0 if x <= 1 else 1 + 10**(-random.randint(12, 14))
 
 
-def test_small_deviations():
+@pytest.mark.parametrize('compact_neighbors', [False, True])
+def test_small_deviations(compact_neighbors):
     """This tests whether the Learner1D can handle small deviations.
     See https://gitlab.kwant-project.org/qt/adaptive/merge_requests/73 and
     https://github.com/python-adaptive/adaptive/issues/78."""
 
     eps = 5e-14
-    learner = Learner1D(small_deviations, bounds=(1 - eps, 1 + eps))
+    learner = Learner1D(small_deviations, bounds=(1 - eps, 1 + eps),
+                        compact_neighbors=compact_neighbors)
 
     # Some non-determinism is needed to make this test fail so we keep
     # a list of points that will be evaluated later to emulate
@@ -239,7 +257,8 @@ def test_ask_does_not_return_known_points_when_returning_bounds():
     assert 0 not in points
 
 
-def test_tell_many():
+@pytest.mark.parametrize('compact_neighbors', [False, True])
+def test_tell_many(compact_neighbors):
     def f(x, offset=0.123214):
         a = 0.01
         return (np.sin(x**2) + np.sin(x**5)
@@ -272,8 +291,10 @@ def test_tell_many():
         assert l1._bbox[0] == l2._bbox[0]
 
     for function in [f, f_vec]:
-        learner = Learner1D(function, bounds=(-1, 1))
-        learner2 = Learner1D(function, bounds=(-1, 1))
+        learner = Learner1D(function, bounds=(-1, 1),
+                            compact_neighbors=compact_neighbors)
+        learner2 = Learner1D(function, bounds=(-1, 1),
+                             compact_neighbors=compact_neighbors)
         simple(learner, goal=lambda l: l.npoints > 200)
         xs, ys = zip(*learner.data.items())
 
@@ -332,13 +353,15 @@ def test_tell_many():
             learner.tell(x, max_value * 10)
             learner2.tell(x, max_value * 10)
 
-    learner = Learner1D(f, bounds=(-1, 1))
-    learner2 = Learner1D(f, bounds=(-1, 1))
+    learner = Learner1D(f, bounds=(-1, 1), compact_neighbors=compact_neighbors)
+    learner2 = Learner1D(f, bounds=(-1, 1),
+                         compact_neighbors=compact_neighbors)
     _random_run(learner, learner2, scale_doubling=False)
     test_equal(learner, learner2)
 
-    learner = Learner1D(f, bounds=(-1, 1))
-    learner2 = Learner1D(f, bounds=(-1, 1))
+    learner = Learner1D(f, bounds=(-1, 1), compact_neighbors=compact_neighbors)
+    learner2 = Learner1D(f, bounds=(-1, 1),
+                         compact_neighbors=compact_neighbors)
     _random_run(learner, learner2, scale_doubling=True)
     test_equal(learner, learner2)
 
@@ -363,3 +386,277 @@ def test_curvature_loss_vectors():
     learner = Learner1D(f, (-1, 1), loss_per_interval=loss)
     simple(learner, goal=lambda l: l.npoints > 100)
     assert learner.npoints > 100
+
+
+def test_array_neighbors():
+    xs = [random.uniform(-1, 1) for _ in range(500)]
+    neighbors = ArrayNeighbors(xs[:100], load=4)
+    for x in xs[100:]:
+        neighbors[x] = None
+
+    xs = sorted(xs)
+    assert len(neighbors) == len(xs)
+    assert list(neighbors) == xs
+    assert neighbors.keys()[10:50] == xs[10:50]
+    for i, x in enumerate(xs):
+        assert neighbors.index(x) == i
+        assert neighbors.bisect_left(x) == i
+        x_left = xs[i - 1] if i > 0 else None
+        x_right = xs[i + 1] if i < len(xs) - 1 else None
+        assert neighbors[x] == [x_left, x_right]
+    assert 2 not in neighbors
+    assert neighbors.bisect_left(2) == len(xs)
+
+
+@pytest.mark.parametrize('loss, vectorized_loss', [
+    (learner1D.default_loss, learner1D.vectorized_default_loss),
+    (learner1D.uniform_loss, learner1D.vectorized_uniform_loss),
+    (learner1D.triangle_loss, learner1D.vectorized_triangle_loss),
+    (curvature_loss_function(), curvature_loss_function(vectorized=True)),
+])
+def test_vectorized_loss(loss, vectorized_loss):
+    def f(x):
+        return np.tanh(20 * x)
+
+    def f_vec(x):
+        return [np.tanh(20 * x), x**2]
+
+    assert vectorized_loss.vectorized
+    assert vectorized_loss.nth_neighbors == loss.nth_neighbors
+
+    for function in [f, f_vec]:
+        control = Learner1D(function, (-1, 1), loss_per_interval=loss)
+        simple(control, goal=lambda l: l.npoints > 100)
+        xs, ys = zip(*control.data.items())
+
+        # Both the per-interval and the bulk calculation of the losses
+        learner = Learner1D(function, (-1, 1),
+                            loss_per_interval=vectorized_loss)
+        for x, y in zip(xs, ys):
+            learner.tell(x, y)
+        learner2 = Learner1D(function, (-1, 1),
+                             loss_per_interval=vectorized_loss)
+        learner2.tell_many(xs, ys, force=True)
+
+        for l in [learner, learner2]:
+            assert l.losses.keys() == control.losses.keys()
+            np.testing.assert_almost_equal(
+                [l.losses[ival] for ival in control.losses],
+                list(control.losses.values()))
+
+
+def test_lazy_rescaling():
+    def counting_loss(xs, ys):
+        counting_loss.ncalls += 1
+        return learner1D.default_loss(xs, ys)
+
+    def f(x):
+        return np.sin(5 * x)
+
+    learner = Learner1D(f, (-1, 1), loss_per_interval=counting_loss,
+                        lazy_rescaling=True)
+    control = Learner1D(f, (-1, 1), loss_per_interval=counting_loss)
+    ncalls = []
+    for l in [learner, control]:
+        counting_loss.ncalls = 0
+        simple(l, goal=lambda l: l.npoints > 100)
+
+        # Increase the y-scale by a factor of 10
+        counting_loss.ncalls = 0
+        l.tell(1e-3, 20)
+        ncalls.append(counting_loss.ncalls)
+
+    assert learner._scale_epoch == control._scale_epoch
+    assert ncalls[0] == 2
+    assert ncalls[1] > 100
+
+    # The outdated losses are recomputed when they are needed.
+    assert learner.loss() == control.loss()
+    assert set(learner.ask(10)[0]) == set(control.ask(10)[0])
+
+
+def test_loss_manager():
+    losses = learner1D.loss_manager(x_scale=2)
+    control = {}
+    for _ in range(1000):
+        ival = tuple(sorted(random.choice([0.5, 1, 2]) * random.random()
+                            for _ in range(2)))
+        loss = random.choice([random.random(), np.inf, 0.25])
+        losses[ival] = control[ival] = loss
+        if random.random() < 0.3:
+            ival = random.choice(list(control))
+            assert losses.pop(ival) == control.pop(ival)
+
+    def sort_key(item):
+        ival, loss = item
+        loss, _ = learner1D.finite_loss(ival, loss, 2)
+        return -loss, ival
+
+    assert losses == control
+    expected = sorted(control.items(), key=sort_key)
+    assert list(losses.items()) == expected
+    assert [losses.peekitem(i) for i in range(len(losses))] == expected
+    assert losses.peekitem(-1) == expected[-1]
+
+
+def test_incremental_ask():
+    def f(x):
+        return np.tanh(20 * x)
+
+    learner = Learner1D(f, (-1, 1))
+    simple(learner, goal=lambda l: l.npoints > 100)
+    xs, ys = zip(*learner.data.items())
+
+    # Subsequent calls continue the allocation of the previous call
+    for n in [1, 5, 5, 20, 3]:
+        control = Learner1D(f, (-1, 1))
+        control.tell_many(xs, ys)
+        points, loss_improvements = learner.ask(n, tell_pending=False)
+        expected = control.ask(n, tell_pending=False)
+        assert sorted(zip(points, loss_improvements)) == sorted(zip(*expected))
+
+    # A large number of points is allocated at once,
+    # but the result is the same
+    n = 1000
+    assert n > len(learner.losses_combined) / 10
+    points, loss_improvements = learner.ask(n, tell_pending=False)
+    quals = learner._greedy_quals([], n)
+    assert len(points) == n
+    assert set(points) == {x for (*ival, n) in quals
+                           for x in learner1D.linspace(*ival, n)}
+
+
+@pytest.mark.parametrize('n', [6, 300])
+def test_ask_returns_points_in_order_of_loss_improvement(n):
+    learner = Learner1D(lambda x: np.tanh(20 * x), (-1, 1))
+    xs = np.linspace(-1, 1, 9 if n < 100 else 100)
+    learner.tell_many(xs, np.tanh(20 * xs))
+
+    points, loss_improvements = learner.ask(n, tell_pending=False)
+    assert len(points) == n
+    # non-increasing, up to the rounding of the losses in 'finite_loss'
+    assert np.all(np.diff(loss_improvements) < 1e-12)
+
+
+@pytest.mark.parametrize('loss_per_interval', [
+    None,
+    curvature_loss_function(),
+    curvature_loss_function(vectorized=True),
+])
+@pytest.mark.parametrize('compact_neighbors', [False, True])
+def test_tell_many_merges_points(loss_per_interval, compact_neighbors):
+    def f(x):
+        return np.tanh(20 * x)
+
+    kwargs = dict(loss_per_interval=loss_per_interval,
+                  compact_neighbors=compact_neighbors)
+    learner = Learner1D(f, (-1, 1), **kwargs)
+    control = Learner1D(f, (-1, 1), **kwargs)
+    for l in [learner, control]:
+        # Fix the scale, such that the losses do not depend
+        # on the order in which the points are added.
+        l.tell_many([-1, 0, 1], [-100, 0, 100])
+
+    for _ in range(20):
+        xs, _ = control.ask(10)
+        for x in xs:
+            learner.tell_pending(x)
+
+        # Leave some points pending
+        random.shuffle(xs)
+        xs = xs[:random.randint(2, 10)]
+        ys = [f(x) for x in xs]
+        for x, y in zip(xs, ys):
+            control.tell(x, y)
+        learner.tell_many(xs, ys)
+
+        for losses, control_losses in [
+                (learner.losses, control.losses),
+                (learner.losses_combined, control.losses_combined)]:
+            assert losses.keys() == control_losses.keys()
+            np.testing.assert_almost_equal(
+                [losses[ival] for ival in control_losses],
+                list(control_losses.values()))
+        assert dict(learner.neighbors_combined.items()) == dict(
+            control.neighbors_combined.items())
+
+
+def test_columnar_data_mapping():
+    data = ColumnarData(load=4)
+    control = {}
+    for _ in range(500):
+        x = random.randint(0, 100) / 7
+        if x in control and random.random() < 0.3:
+            del data[x], control[x]
+        else:
+            data[x] = control[x] = np.random.rand(2)
+    assert sorted(control) == list(data)
+    xs, ys = data.arrays()
+    assert xs.tolist() == sorted(control)
+    np.testing.assert_array_equal(ys, [control[x] for x in xs])
+    with pytest.raises(KeyError):
+        data[-1]
+    with pytest.raises(ValueError):
+        data[-1] = 1
+
+
+@pytest.mark.parametrize('vectorized_loss', [False, True])
+def test_columnar_data(vectorized_loss):
+    def f(x):
+        return [np.tanh(20 * x), x**2, 5 * np.sin(3 * x)]
+
+    loss = curvature_loss_function(vectorized=vectorized_loss)
+    learner = Learner1D(f, (-1, 1), loss_per_interval=loss,
+                        columnar_data=True)
+    control = Learner1D(f, (-1, 1), loss_per_interval=loss)
+    for l in [learner, control]:
+        simple(l, goal=lambda l: l.npoints > 200)
+
+    assert list(learner.data) == sorted(control.data)
+    for x, y in control.data.items():
+        np.testing.assert_array_equal(learner.data[x], y)
+    np.testing.assert_array_equal(learner._bbox[1], control._bbox[1])
+    assert learner._scale == control._scale
+    assert learner.losses.keys() == control.losses.keys()
+
+    # Rebuild from the data
+    xs, ys = zip(*control.data.items())
+    learner = Learner1D(f, (-1, 1), loss_per_interval=loss,
+                        columnar_data=True)
+    learner.tell_many(xs, ys, force=True)
+    np.testing.assert_array_equal(learner._bbox[1], control._bbox[1])
+    assert learner.losses.keys() == control.losses.keys()
+
+
+@pytest.mark.parametrize('columnar_data', [False, True])
+def test_interpolate(columnar_data):
+    def f(x):
+        return np.tanh(20 * x)
+
+    def f_vec(x):
+        return [np.tanh(20 * x), x**2]
+
+    xs = np.random.uniform(-1.2, 1.2, size=(50, 4))
+    for function in [f, f_vec]:
+        learner = Learner1D(function, (-1, 1), columnar_data=columnar_data)
+        assert np.isnan(learner.interpolate(xs)).all()
+        simple(learner, goal=lambda l: l.npoints > 50)
+
+        points, values = zip(*sorted(learner.data.items()))
+        values = np.array(values)
+        ys = learner.interpolate(xs)
+        if values.ndim == 1:
+            expected = np.interp(xs, points, values, left=np.nan,
+                                 right=np.nan)
+        else:
+            expected = np.stack([np.interp(xs, points, v, left=np.nan,
+                                           right=np.nan)
+                                 for v in values.T], axis=-1)
+        assert ys.shape == expected.shape
+        np.testing.assert_allclose(ys, expected)
+        assert learner.interpolate(points[3]) == pytest.approx(values[3])
+
+        # The cached data is updated when points are added
+        assert 0.123 not in learner.data
+        learner.tell(0.123, function(0.2))
+        np.testing.assert_allclose(learner.interpolate(0.123), function(0.2))
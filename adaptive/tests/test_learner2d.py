@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+
+from collections import Counter
+import itertools
+
+import numpy as np
+import pytest
+
+from adaptive.learner import Learner2D
+from adaptive.learner.learner2D import (choose_point_in_triangle,
+                                        choose_points_in_triangles,
+                                        local_default_loss, local_loss,
+                                        minimize_triangle_surface_loss,
+                                        triangle_areas, uniform_loss)
+from adaptive.runner import simple
+
+
+def ring_of_fire(xy, d=0.75):
+    a = 0.2
+    x, y = xy
+    return x + np.exp(-(x**2 + y**2 - d**2)**2 / a**4)
+
+
+@pytest.mark.parametrize('loss_per_triangle', [
+    uniform_loss,
+    minimize_triangle_surface_loss,
+    local_default_loss,
+])
+def test_local_loss_matches_retriangulation(loss_per_triangle):
+    learner = Learner2D(ring_of_fire, bounds=[(-1, 1), (-1, 2)],
+                        loss_per_triangle=loss_per_triangle)
+    learner._recompute_losses_factor = 1
+    simple(learner, goal=lambda l: l.npoints > 200)
+
+    assert learner.tri is not None
+    ip = learner.ip()
+    assert len(learner.tri.simplices) == len(ip.tri.simplices)
+    assert learner.loss() == pytest.approx(loss_per_triangle(ip).max())
+
+    control = Learner2D(ring_of_fire, bounds=[(-1, 1), (-1, 2)],
+                        loss_per_triangle=loss_per_triangle)
+    control._set_data(learner.data)
+    assert control.loss() == pytest.approx(learner.loss())
+
+
+def test_slivers_keep_tri_valid():
+    def f(xy):
+        x, y = xy
+        return np.sin(4 * x) + x * np.cos(3 * y)
+
+    learner = Learner2D(f, bounds=[(-1, 1), (-2, 2)],
+                        loss_per_triangle=minimize_triangle_surface_loss)
+    simple(learner, goal=lambda l: l.npoints > 1000)
+    # No points pile up next to the bounds.
+    points = np.array(list(learner.data))
+    distance = np.min(np.abs(np.hstack([points - (-1, -2),
+                                        points - (1, 2)])), axis=1)
+    assert not np.any((0 < distance) & (distance < 1e-3))
+    # The triangles do not overlap.
+    tri = learner.tri
+    triangles = learner._scale([tri.get_vertices(s) for s in tri.simplices])
+    assert triangle_areas(triangles).sum() == pytest.approx(1)
+    edges = Counter(edge for simplex in tri.simplices
+                    for edge in itertools.combinations(sorted(simplex), 2))
+    assert max(edges.values()) == 2
+
+
+def test_custom_local_loss():
+    @local_loss
+    def area_loss(points, values):
+        return triangle_areas(points)
+
+    learner = Learner2D(ring_of_fire, bounds=[(-1, 1), (-1, 1)],
+                        loss_per_triangle=area_loss)
+    simple(learner, goal=lambda l: l.npoints > 100)
+    assert learner.loss() == pytest.approx(area_loss(learner.ip()).max())
+    assert learner.loss() <= 4 / 50
+
+
+def test_local_gradients_of_linear_function():
+    def plane(xy):
+        x, y = xy
+        return 2 * x - 3 * y
+
+    learner = Learner2D(plane, bounds=[(-1, 1), (-1, 1)],
+                        loss_per_triangle=local_default_loss)
+    simple(learner, goal=lambda l: l.npoints > 50)
+    # A linear function is estimated exactly, so the loss is 0.3 * area.
+    assert learner.loss() == pytest.approx(
+        0.3 * max(triangle_areas(learner.ip().tri.points[
+            learner.ip().tri.vertices])))
+    for gradient in learner._gradients.values():
+        # The gradients are with respect to the scaled coordinates,
+        # which span 1 instead of 2.
+        assert gradient[0] == pytest.approx([4, -6])
+
+
+@pytest.mark.parametrize('loss_per_triangle', [None, uniform_loss])
+def test_ask_many_points_in_order_of_loss(loss_per_triangle):
+    learner = Learner2D(ring_of_fire, bounds=[(-1, 1), (-1, 1)],
+                        loss_per_triangle=loss_per_triangle)
+    simple(learner, goal=lambda l: l.npoints > 100)
+    points, losses = learner.ask(150)
+    assert len(set(points)) == 150
+    assert list(losses) == sorted(losses, reverse=True)
+
+
+def test_data_in_bounds_buffers():
+    learner = Learner2D(ring_of_fire, bounds=[(-1, 1), (-1, 1)])
+    simple(learner, goal=lambda l: l.npoints > 50)
+    learner.tell((2, 0), 1.0)  # outside the bounds
+    points, values = learner._data_in_bounds()
+    expected = {p: v for p, v in learner.data.items()
+                if learner.inside_bounds(p)}
+    assert len(points) == len(expected) == learner.npoints - 1
+    for p, v in zip(points, values):
+        assert expected[tuple(p)] == v
+
+    other = Learner2D(ring_of_fire, bounds=[(-1, 1), (-1, 1)])
+    other._set_data(learner.data)
+    np.testing.assert_array_equal(other._data_in_bounds()[0], points)
+    np.testing.assert_array_equal(other._data_in_bounds()[1], values)
+
+
+def test_pending_points_subdivide_triangles():
+    learner = Learner2D(ring_of_fire, bounds=[(-1, 1), (-1, 1)],
+                        loss_per_triangle=uniform_loss)
+    simple(learner, goal=lambda l: l.npoints > 100)
+
+    points, _ = learner.ask(20, tell_pending=False)
+    assert not learner.pending_points and not learner._subtriangulations
+    assert set(learner._losses_combined) == {
+        (simplex, ()) for simplex in learner._losses}
+
+    rng = np.random.RandomState(0)
+    points, _ = learner.ask(50)
+    assert learner._uses_tri()
+    # The pending values are interpolated in the triangles of 'tri'.
+    pending, values = learner._data_interp()
+    np.testing.assert_allclose(
+        values, learner.ip()(learner._scale(pending)), atol=1e-12)
+    # The loss is distributed over the subtriangles.
+    assert learner.loss(real=False) <= learner.loss()
+    assert sum(learner._losses_combined.values()) == pytest.approx(
+        sum(learner._losses.values()))
+
+    for i in rng.permutation(len(points)):
+        learner.tell(points[i], ring_of_fire(points[i]))
+        n_pending = sum(len(subtri.vertices) - 3
+                        for subtri in learner._subtriangulations.values())
+        assert n_pending == len(learner.pending_points)
+    assert not learner._subtriangulations
+
+
+def test_told_points_enter_tri():
+    learner = Learner2D(ring_of_fire, bounds=[(-1, 1), (-1, 1)],
+                        loss_per_triangle=uniform_loss)
+    simple(learner, goal=lambda l: l.npoints > 50)
+    tri = learner.tri
+
+    # A stale simplex hint falls back to locating the point.
+    point = (0.0123, -0.0456)
+    wrong = next(s for s in tri.simplices
+                 if not tri.point_in_simplex(point, s))
+    learner._pending_to_simplex[point] = wrong
+    learner.tell(point, ring_of_fire(point))
+    assert point in tri.vertices
+    assert point not in learner._pending_to_simplex
+    assert set(learner._losses) == tri.simplices
+
+    # A point coinciding with a vertex is kept in 'data' only.
+    vertex = (point[0] + 1e-15, point[1])
+    learner.tell_pending(vertex)
+    learner.tell(vertex, ring_of_fire(vertex))
+    assert vertex in learner.data and vertex not in tri.vertices
+    assert vertex not in learner.pending_points
+    assert set(learner._losses) == tri.simplices
+
+
+def test_choose_points_in_triangles():
+    rng = np.random.RandomState(0)
+    triangles = rng.uniform(-1, 1, size=(100, 3, 2))
+    triangles[:50, 2] = triangles[:50, 0] + 1e-3  # badly shaped triangles
+    points = choose_points_in_triangles(triangles, max_badness=5)
+    for triangle, point in zip(triangles, points):
+        assert np.array_equal(
+            point, choose_point_in_triangle(triangle, max_badness=5))
+
+    # The orientation of the triangles does not matter.
+    sliver = np.array([[0, 0], [1, 0], [0.5, 1e-3]])
+    points = choose_points_in_triangles(
+        np.array([sliver, sliver[::-1]]), max_badness=5)
+    np.testing.assert_array_equal(points, [[0.5, 0], [0.5, 0]])
+
+
+@pytest.mark.parametrize('aspect_ratio', [1, 2])
+def test_incremental_raster_image(aspect_ratio):
+    learner = Learner2D(ring_of_fire, bounds=[(-1, 1), (-2, 1)],
+                        loss_per_triangle=uniform_loss)
+    learner.aspect_ratio = aspect_ratio
+    simple(learner, goal=lambda l: l.npoints > 100)
+    learner._raster_image(n=50)
+    simple(learner, goal=lambda l: l.npoints > 200)
+    # Only the triangles added since the previous image are rasterized.
+    image = learner._raster_image(n=50)
+    x = y = np.linspace(-0.5, 0.5, 50)
+    expected = learner.ip()(x[:, None], y[None, :] * aspect_ratio)
+    np.testing.assert_allclose(image, expected, atol=1e-12)
+
+    assert len(learner._raster_image(n_max=20)) == 20
+
+
+def annulus(points):
+    r = np.hypot(points[:, 0], points[:, 1])
+    return (0.5 <= r) & (r <= 1)
+
+
+L_shape = [(-1, -1), (1, -1), (1, 0), (0, 0), (0, 1), (-1, 1)]
+
+
+@pytest.mark.parametrize('domain', [L_shape, annulus])
+@pytest.mark.parametrize('loss_per_triangle', [None, uniform_loss])
+def test_domain(domain, loss_per_triangle):
+    learner = Learner2D(ring_of_fire, bounds=[(-1, 1), (-1, 1)],
+                        loss_per_triangle=loss_per_triangle, domain=domain)
+    if domain is L_shape:
+        assert set(learner._bounds_points) == set(
+            map(tuple, np.array(L_shape, dtype=float)))
+    while learner.npoints < 200:
+        points, _ = learner.ask(10)
+        assert learner._in_domain(points).all()
+        for p in points:
+            learner.tell(p, ring_of_fire(p))
+    assert len(learner._data_in_bounds()[0]) == learner.npoints
+    assert np.isfinite(learner.loss())
+
+
+@pytest.mark.parametrize('loss_per_triangle', [None, uniform_loss])
+def test_callable_domain_is_covered(loss_per_triangle):
+    learner = Learner2D(ring_of_fire, bounds=[(-1, 1), (-1, 1)],
+                        loss_per_triangle=loss_per_triangle, domain=annulus)
+    simple(learner, goal=lambda l: l.npoints > 100)
+    points = np.array(list(learner.data))
+    r = np.hypot(points[:, 0], points[:, 1])
+    angle = np.arctan2(points[:, 1], points[:, 0])
+    sector = np.floor((angle + np.pi) / (2 * np.pi) * 8).astype(int) % 8
+    # Points are sampled close to both circles in every direction.
+    for i in range(8):
+        assert r[sector == i].max() > 0.99
+        assert r[sector == i].min() < 0.51
+
+
+def test_polygon_with_hole():
+    square = [(-1, -1), (1, -1), (1, 1), (-1, 1)]
+    hole = [(-0.5, -0.5), (0.5, -0.5), (0.5, 0.5), (-0.5, 0.5)]
+    learner = Learner2D(ring_of_fire, bounds=[(-1, 1), (-1, 1)],
+                        domain=[square, hole])
+    inside = learner._in_domain([(0, 0), (0.75, 0), (0.5, 0), (1, 1)])
+    assert list(inside) == [False, True, True, True]
+    assert not learner.inside_bounds((0.1, 0.2))
+
+
+def test_changing_aspect_ratio_rebuilds_tri():
+    learner = Learner2D(ring_of_fire, bounds=[(-1, 1), (-1, 1)],
+                        loss_per_triangle=uniform_loss)
+    simple(learner, goal=lambda l: l.npoints > 100)
+    learner.aspect_ratio = 2
+    assert learner.loss() == pytest.approx(
+        uniform_loss(learner.ip()).max())
+
+
+@pytest.mark.parametrize('loss_per_triangle', [None, local_default_loss])
+def test_auto_aspect_ratio(loss_per_triangle):
+    def front(xy):
+        x, y = xy
+        return np.tanh((x - 0.2 * y) / 0.03) + 0.1 * y
+
+    learner = Learner2D(front, bounds=[(-1, 1), (-1, 1)],
+                        loss_per_triangle=loss_per_triangle)
+    learner.auto_aspect_ratio = True
+    changes = []  # 'npoints' when 'aspect_ratio' changed
+    while learner.npoints <= 300:
+        aspect_ratio = learner.aspect_ratio
+        points, _ = learner.ask(1)
+        learner.tell(points[0], front(points[0]))
+        if learner.aspect_ratio != aspect_ratio:
+            changes.append(learner.npoints)
+    # It is only changed again once the number of points has doubled.
+    assert changes
+    assert all(b >= 2 * a for a, b in zip(changes, changes[1:]))
+    # The function changes faster along x, so the triangles
+    # are stretched along y.
+    assert learner.aspect_ratio < 0.5
+    if learner.tri is not None:
+        learner.tell((0.5, 0.5), front((0.5, 0.5)))
+        total = sum(learner._gradient_sums.values())
+        np.testing.assert_allclose(learner._gradient_total, total)
+
+
+@pytest.mark.parametrize('loss_per_triangle', [
+    None, uniform_loss, local_default_loss])
+def test_checkpoint(loss_per_triangle):
+    learner = Learner2D(ring_of_fire, bounds=[(-1, 1), (-1, 2)],
+                        loss_per_triangle=loss_per_triangle)
+    simple(learner, goal=lambda l: l.npoints > 200)
+    learner.ask(5, tell_pending=False)  # fill the stack
+    checkpoint = learner._get_data()
+
+    control = Learner2D(ring_of_fire, bounds=[(-1, 1), (-1, 2)],
+                        loss_per_triangle=loss_per_triangle)
+    control._set_data(checkpoint)
+    assert control.data == learner.data
+    assert control._stack == learner._stack
+    if loss_per_triangle is not None:
+        # The triangulation and the losses are restored.
+        assert control._tri is not None
+        assert control._tri.simplices == learner.tri.simplices
+        assert dict(control._losses) == dict(learner._losses)
+    assert control.loss() == learner.loss()
+    assert control.ask(20) == learner.ask(20)
+
+    # The losses of another loss function are computed again.
+    other = Learner2D(ring_of_fire, bounds=[(-1, 1), (-1, 2)],
+                      loss_per_triangle=minimize_triangle_surface_loss)
+    other._set_data(checkpoint)
+    assert other.loss() == pytest.approx(
+        minimize_triangle_surface_loss(other.ip()).max())
+
+
+def everywhere(points):
+    return np.ones(len(points), dtype=bool)
+
+
+def test_checkpoint_with_other_settings():
+    def restores_tri(checkpoint, **kwargs):
+        learner = Learner2D(ring_of_fire, bounds=[(-1, 1), (-1, 1)],
+                            loss_per_triangle=uniform_loss, **kwargs)
+        learner._set_data(checkpoint)
+        return learner._tri is not None
+
+    square = [(-1, -1), (1, -1), (1, 1), (-1, 1)]
+    for domain in [None, everywhere, square]:
+        learner = Learner2D(ring_of_fire, bounds=[(-1, 1), (-1, 1)],
+                            loss_per_triangle=uniform_loss, domain=domain)
+        simple(learner, goal=lambda l: l.npoints > 50)
+        checkpoint = learner._get_data()
+        # The triangulation is only restored for the same domain.
+        for other in [None, everywhere, square]:
+            assert restores_tri(checkpoint, domain=other) == (
+                other is domain)
+    bigger_square = [(-2, -2), (2, -2), (2, 2), (-2, 2)]
+    assert not restores_tri(checkpoint, domain=bigger_square)
+
+    # The triangulation must contain all points in bounds.
+    data = dict(checkpoint['data'])
+    data[(0.123, 0.456)] = ring_of_fire((0.123, 0.456))
+    assert not restores_tri(dict(checkpoint, data=data), domain=square)
+
+    def front(xy):
+        x, y = xy
+        return np.tanh((x - 0.2 * y) / 0.03) + 0.1 * y
+
+    learner = Learner2D(front, bounds=[(-1, 1), (-1, 1)],
+                        loss_per_triangle=uniform_loss)
+    learner.auto_aspect_ratio = True
+    simple(learner, goal=lambda l: l.npoints > 100)
+    assert learner.aspect_ratio != 1
+    control = Learner2D(front, bounds=[(-1, 1), (-1, 1)],
+                        loss_per_triangle=uniform_loss)
+    control.auto_aspect_ratio = True
+    control._set_data(learner._get_data())
+    # The estimated aspect ratio is restored with the triangulation.
+    assert control.aspect_ratio == learner.aspect_ratio
+    assert control._tri is not None
+    assert control.ask(10) == learner.ask(10)
@@ -38,3 +38,16 @@ def test_interior_vs_bbox_gives_same_result():
     simple(learner, goal=lambda l: l.loss() < 0.1)
 
     assert learner.data == control.data
+
+
+def test_compact_triangulation_gives_same_result():
+    f = generate_random_parametrization(ring_of_fire)
+
+    control = LearnerND(f, bounds=[(-1, 1), (-1, 1)])
+    learner = LearnerND(f, bounds=[(-1, 1), (-1, 1)],
+                        compact_triangulation=True)
+
+    simple(control, goal=lambda l: l.loss() < 0.1)
+    simple(learner, goal=lambda l: l.loss() < 0.1)
+
+    assert learner.data == control.data
@@ -33,6 +33,7 @@ LOSS_FUNCTIONS = {
         adaptive.learner.learner1D.default_loss,
         adaptive.learner.learner1D.uniform_loss,
         adaptive.learner.learner1D.curvature_loss_function(),
+        adaptive.learner.learner1D.vectorized_default_loss,
     )),
     Learner2D: ('loss_per_triangle', (
         adaptive.learner.learner2D.default_loss,
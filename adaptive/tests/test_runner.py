@@ -2,11 +2,12 @@
 
 import asyncio
 
+import numpy as np
 import pytest
 
 from adaptive.learner import Learner1D, Learner2D
 from adaptive.runner import (simple, BlockingRunner, AsyncRunner,
-    SequentialExecutor, with_ipyparallel, with_distributed)
+    SequentialExecutor, replay_log, with_ipyparallel, with_distributed)
 
 
 def blocking_runner(learner, goal):
@@ -50,6 +51,38 @@ def test_nonconforming_output(runner):
     runner(Learner2D(f, [(-1, 1), (-1, 1)]), trivial_goal)
 
 
+@pytest.mark.parametrize('runner', runners)
+def test_vectorized_function(runner):
+    ncalls = []
+
+    def f(xs):
+        ncalls.append(len(xs))
+        return np.column_stack([np.sin(xs), xs**2])
+
+    learner = Learner1D(f, (-1, 1), vectorized_function=True)
+    runner(learner, lambda l: l.npoints > 100)
+    assert learner.npoints > 100
+    assert learner.vdim == 2
+    assert sum(ncalls) == learner.npoints
+    assert len(ncalls) < learner.npoints / 5
+    for x, y in learner.data.items():
+        np.testing.assert_almost_equal(y, [np.sin(x), x**2])
+
+
+def test_replay_log_of_vectorized_runner():
+    def f(xs):
+        return np.sin(10 * xs)
+
+    learner = Learner1D(f, (-1, 1), vectorized_function=True)
+    runner = BlockingRunner(learner, lambda l: l.npoints > 100,
+                            executor=SequentialExecutor(), log=True)
+
+    control = Learner1D(f, (-1, 1), vectorized_function=True)
+    replay_log(control, runner.log)
+    assert control.data == learner.data
+    assert control.pending_points == learner.pending_points
+
+
 def test_aync_def_function():
 
     async def f(x):
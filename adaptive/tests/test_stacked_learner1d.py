@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+from functools import partial
+
+import numpy as np
+import pytest
+
+from adaptive.learner import BalancingLearner, Learner1D, StackedLearner1D
+from adaptive.learner.learner1D import (curvature_loss_function,
+                                        vectorized_default_loss)
+from adaptive.runner import simple
+
+
+def f(x, a, b):
+    return np.tanh(a * (x - b))
+
+
+combos = {'a': [1, 10, 100], 'b': [-0.3, 0, 0.3]}
+
+
+@pytest.mark.parametrize('loss_per_interval', [
+    vectorized_default_loss,
+    curvature_loss_function(vectorized=True),
+])
+def test_losses_match_learner1D(loss_per_interval):
+    learner = StackedLearner1D.from_product(f, (-1, 1), combos,
+                                            loss_per_interval)
+    simple(learner, goal=lambda l: l.npoints > 300)
+    learner.tell_pending((0, 0.123))
+
+    losses = learner.losses(real=True)
+    losses_combined = learner.losses(real=False)
+    for index, data in enumerate(learner._get_data()):
+        control = Learner1D(learner.functions[index], (-1, 1),
+                            loss_per_interval=loss_per_interval)
+        control.tell_many(*zip(*data.items()), force=True)
+        if index == 0:
+            control.tell_pending(0.123)
+        assert losses[index] == pytest.approx(control.loss(real=True))
+        assert losses_combined[index] == pytest.approx(
+            control.loss(real=False))
+
+
+def test_pending_points():
+    learner = StackedLearner1D.from_product(f, (-1, 1), combos)
+    points, loss_improvements = learner.ask(5, tell_pending=False)
+    assert not learner.pending_points
+    assert learner.ask(5) == (points, loss_improvements)
+    assert learner.pending_points == set(points)
+    assert loss_improvements == [np.inf] * 5
+
+    # All the bounds are asked first, then the intervals are split.
+    points, _ = learner.ask(50)
+    assert {x for _, x in learner.pending_points} > {-1, 1}
+    learner.tell_many(points, [learner.function(p) for p in points])
+    assert learner.npoints == 50
+    learner.remove_unfinished()
+    assert not learner.pending_points
+    assert learner.npoints == 50
+    assert learner.losses(real=False).tolist() == learner.losses().tolist()
+
+    with pytest.raises(ValueError):
+        learner.tell((0, 2), 0)
+
+
+def test_nan_values_are_not_pending():
+    def g(x, a):
+        return np.nan if abs(x) < 0.3 else np.tanh(a * x)
+
+    learner = StackedLearner1D.from_product(g, (-1, 1), {'a': [1, 10]})
+    simple(learner, goal=lambda l: l.npoints >= 100)
+    learner.tell((0, 0.0), np.nan)
+
+    assert not learner.pending_points
+    assert learner.npoints == len(learner.data)
+    assert any(np.isnan(y) for y in learner.data.values())
+    assert np.isfinite(learner.loss())
+
+    # Pending points are still told after a NaN value
+    points, _ = learner.ask(10)
+    assert learner.pending_points == set(points)
+    learner.tell_many(points, [np.nan] * len(points))
+    assert not learner.pending_points
+
+
+def test_copy_from_balancing_learner():
+    balancing_learner = BalancingLearner.from_product(
+        f, Learner1D, dict(bounds=(-1, 1)), combos)
+    simple(balancing_learner, goal=lambda l: l.loss() < 0.05)
+
+    learner = StackedLearner1D.from_product(f, (-1, 1), combos)
+    learner.copy_from(balancing_learner)
+    assert learner.npoints == sum(l.npoints
+                                  for l in balancing_learner.learners)
+    assert learner._get_data() == balancing_learner._get_data()
+    assert learner.data == {(index, x): y for index, l
+                            in enumerate(balancing_learner.learners)
+                            for x, y in l.data.items()}
+
+
+def test_non_vectorized_loss_raises():
+    with pytest.raises(ValueError):
+        StackedLearner1D([partial(f, a=1, b=0)], (-1, 1),
+                         loss_per_interval=curvature_loss_function())
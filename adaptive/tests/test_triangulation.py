@@ -6,8 +6,10 @@ import itertools
 import pytest
 
 import numpy as np
+import scipy.spatial
 
-from adaptive.learner.triangulation import Triangulation
+from adaptive.learner.triangulation import (
+    Triangulation, CompactTriangulation, circumsphere, circumspheres)
 
 with_dimension = pytest.mark.parametrize('dim', [2, 3, 4])
 
@@ -39,6 +41,13 @@ def _check_simplices_are_valid(t):
             vertex_to_simplices[vertex].add(simplex)
     assert vertex_to_simplices == t.vertex_to_simplices
 
+    face_to_simplices = {}
+    for simplex in t.simplices:
+        for face in itertools.combinations(simplex, t.dim):
+            face_to_simplices.setdefault(face, set()).add(simplex)
+    assert face_to_simplices == t.face_to_simplices
+    assert t.reference_invariant()
+
 
 def _check_faces_are_valid(t):
     """Check that a 'dim-1'-D face is shared by no more than 2 simplices."""
@@ -332,3 +341,113 @@ def test_initialisation_accepts_more_than_one_simplex(dim):
     _check_triangulation_is_valid(tri)
 
     assert tri.simplices == {simplex1, simplex2}
+
+
+def _locate_point_by_scan(tri, point):
+    for simplex in tri.simplices:
+        if tri.point_in_simplex(point, simplex):
+            return simplex
+    return ()
+
+
+@with_dimension
+def test_locate_point_matches_scan(dim):
+    rng = np.random.RandomState(0)
+    tri = _make_triangulation(rng.uniform(size=(50, dim)))
+
+    for point in rng.uniform(-0.2, 1.2, size=(100, dim)):
+        simplex = tri.locate_point(point)
+        if simplex:
+            assert tri.point_in_simplex(point, simplex)
+        else:
+            assert _locate_point_by_scan(tri, point) == ()
+
+
+@with_dimension
+def test_locate_point_with_deleted_start(dim):
+    rng = np.random.RandomState(1)
+    tri = _make_triangulation(rng.uniform(size=(20, dim)))
+    start = next(iter(tri.simplices))
+    point = np.average(tri.get_vertices(start), axis=0)
+    tri.add_point(point, simplex=start)
+    assert start not in tri.simplices
+
+    for point in rng.uniform(size=(20, dim)):
+        simplex = tri.locate_point(point, start=start)
+        assert simplex == () or tri.point_in_simplex(point, simplex)
+        assert bool(simplex) == bool(_locate_point_by_scan(tri, point))
+
+
+@with_dimension
+def test_adding_inside_point_as_outside_point_is_reverted(dim):
+    t = Triangulation(_make_standard_simplex(dim))
+    simplices = t.simplices.copy()
+    with pytest.raises(ValueError):
+        t.add_point([0.1] * dim, simplex=())
+
+    assert t.simplices == simplices
+    _check_triangulation_is_valid(t)
+
+
+@with_dimension
+@pytest.mark.parametrize('provide_simplex', [True, False])
+def test_extending_hull_covers_convex_hull(dim, provide_simplex):
+    points = np.random.RandomState(2).normal(size=(30, dim))
+    t = Triangulation(points[:dim + 1])
+    for point in points[dim + 1:]:
+        outside = scipy.spatial.Delaunay(t.vertices).find_simplex(point) < 0
+        simplex = () if provide_simplex and outside else None
+        _add_point_with_check(t, point, simplex=simplex)
+
+    _check_triangulation_is_valid(t)
+    hull = scipy.spatial.ConvexHull(points)
+    assert t.hull == set(hull.vertices)
+    assert np.isclose(np.sum(t.volumes()), hull.volume)
+
+
+@with_dimension
+def test_compact_triangulation_matches_triangulation(dim):
+    points = np.random.RandomState(3).normal(size=(40, dim))
+    t = Triangulation(points[:dim + 1])
+    compact = CompactTriangulation(points[:dim + 1])
+    for point in points[dim + 1:]:
+        assert compact.locate_point(point) == t.locate_point(point)
+        t.add_point(point)
+        _add_point_with_check(compact, point)
+
+    _check_triangulation_is_valid(compact)
+    assert compact.vertices == t.vertices
+    assert compact.simplices == t.simplices
+    assert compact.vertex_to_simplices == t.vertex_to_simplices
+    assert compact.face_to_simplices == t.face_to_simplices
+    assert compact.hull == t.hull
+
+
+@pytest.mark.parametrize('dim', [2, 3, 4, 5, 6])
+def test_circumspheres(dim):
+    simplices = np.random.RandomState(4).normal(size=(10, dim + 1, dim))
+    centers, radii = circumspheres(simplices)
+
+    for simplex, center, radius in zip(simplices, centers, radii):
+        distances = np.linalg.norm(simplex - center, axis=1)
+        assert np.allclose(distances, radius)
+        if dim <= 3:
+            assert np.allclose(circumsphere(simplex)[0], center)
+
+    flat = _make_standard_simplex(dim)
+    flat[-1] = flat[1]
+    centers, radii = circumspheres([flat])
+    assert np.isnan(radii[0])
+
+
+@with_dimension
+@pytest.mark.parametrize('cls', [Triangulation, CompactTriangulation])
+def test_point_in_circumsphere_depends_on_transform(dim, cls):
+    t = cls(_make_standard_simplex(dim))
+    simplex = next(iter(t.simplices))
+    t.vertices.append([0.5, -0.3] + [0] * (dim - 2))
+    squeeze = np.diag([1] + [0.1] * (dim - 1))
+
+    assert not t.point_in_cicumcircle(dim + 1, simplex, np.eye(dim))
+    assert t.point_in_cicumcircle(dim + 1, simplex, squeeze)
+    assert not t.point_in_cicumcircle(dim + 1, simplex, np.eye(dim))
@@ -1,7 +1,9 @@
 import adaptive
+from adaptive.learner.learner1D import finite_loss, loss_manager
 
 import numpy as np
 import random
+import sortedcollections
 
 
 offset = random.uniform(-0.5, 0.5)
@@ -45,3 +47,39 @@ class TimeLearner2D:
     def time_tell(self):
         for x, y in zip(self.xs, self.ys):
             self.learner.tell(x, y)
+
+
+def item_sorted_dict_loss_manager(x_scale):
+    # The loss manager that was used before 'LossManager'.
+    def sort_key(ival, loss):
+        loss, ival = finite_loss(ival, loss, x_scale)
+        return -loss, ival
+    return sortedcollections.ItemSortedDict(sort_key)
+
+
+class TimeLossManager:
+    params = ['LossManager', 'ItemSortedDict']
+    param_names = ['implementation']
+
+    def setup(self, implementation):
+        if implementation == 'LossManager':
+            self.losses = loss_manager(1)
+        else:
+            self.losses = item_sorted_dict_loss_manager(1)
+        xs = np.sort(np.random.rand(10**4))
+        for ival, loss in zip(zip(xs, xs[1:]), np.random.rand(10**4)):
+            self.losses[ival] = loss
+
+    def time_split_largest(self):
+        # What 'Learner1D' does when it repeatedly splits the interval
+        # with the largest loss.
+        losses = self.losses
+        for _ in range(10**4):
+            (a, b), loss = losses.peekitem(0)
+            losses.pop((a, b))
+            x = (a + b) / 2
+            losses[a, x] = losses[x, b] = loss / 2
+
+    def time_peek_top(self):
+        for i in range(100):
+            self.losses.peekitem(i)